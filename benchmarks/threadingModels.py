@@ -0,0 +1,138 @@
+"""
+Render pipeline threading model benchmark.
+
+Renders a heavy scene headless with each threading model and compares frame
+times, each model runs in its own process since the threading model can not
+be changed once the main window (buffer) has been created.
+
+    python benchmarks/threadingModels.py -frames 300 -nodes 2000 -movers 500
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+current_dir = os.path.dirname(os.path.realpath(__file__))
+root_dir = os.path.dirname(current_dir)
+sys.path.append(root_dir)
+sys.path.append(os.path.join(root_dir, "src"))
+
+
+parser = argparse.ArgumentParser()
+parser.add_argument("-model", "--Model", default=None,
+                    help="run a single threading model in this process")
+parser.add_argument("-frames", "--Frames", type=int, default=300)
+parser.add_argument("-nodes", "--Nodes", type=int, default=2000,
+                    help="number of geom nodes in scene")
+parser.add_argument("-movers", "--Movers", type=int, default=500,
+                    help="number of nodes moved from python each frame")
+parser.add_argument("-warmup", "--Warmup", type=int, default=30)
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def create_scene(engine, num_nodes):
+    from utils.geometry import Box
+
+    geom_node = Box(1, 1, 1)
+    side = int(num_nodes ** 0.5) + 1
+    nps = []
+
+    for i in range(num_nodes):
+        np = engine.render.attachNewNode(geom_node.make_copy())
+        np.setPos((i % side) * 2 - side, (i // side) * 2, 0)
+        nps.append(np)
+
+    engine.cam.setPos(0, -side * 2, side)
+    engine.cam.lookAt(0, side, 0)
+    return nps
+
+
+def run_model(model, args):
+    """Runs the benchmark scene with given threading model, returns frame
+    times in seconds."""
+
+    from engine import Engine
+
+    engine = Engine(headless=True, threading_model=model)
+    nps = create_scene(engine, args.Nodes)
+    movers = nps[:args.Movers]
+
+    frame_times = []
+
+    for frame in range(args.Warmup + args.Frames):
+        start = time.perf_counter()
+
+        # simulate python side scene mutations done by scripts
+        for i, np in enumerate(movers):
+            np.setH(np.getH() + 1)
+            np.setZ((frame + i) % 10 * 0.1)
+
+        engine.update()
+
+        if frame >= args.Warmup:
+            frame_times.append(time.perf_counter() - start)
+
+    engine.sync_frame()
+    return engine.threading_model, frame_times
+
+
+def main():
+    args = parser.parse_args()
+
+    if args.Model is not None:
+        model, frame_times = run_model(args.Model, args)
+        print(json.dumps({"model": model, "frame_times": frame_times}))
+        return
+
+    from engine import THREADING_MODELS
+
+    results = []
+    for model in THREADING_MODELS:
+        cmd = [sys.executable, os.path.realpath(__file__),
+               "-model", model,
+               "-frames", str(args.Frames),
+               "-nodes", str(args.Nodes),
+               "-movers", str(args.Movers),
+               "-warmup", str(args.Warmup)]
+
+        output = subprocess.run(cmd, capture_output=True, text=True)
+        lines = [line for line in output.stdout.splitlines() if line.startswith("{")]
+        if output.returncode != 0 or not lines:
+            print("-- Threading model '{0}' failed".format(model))
+            print(output.stderr)
+            continue
+
+        results.append((model, json.loads(lines[-1])))
+
+    print()
+    print("{0:<12}{1:>10}{2:>10}{3:>10}{4:>10}{5:>10}".format(
+          "Model", "Mean(ms)", "P50", "P95", "P99", "Speedup"))
+
+    baseline = None
+    for model, result in results:
+        times = result["frame_times"]
+        mean = sum(times) / len(times)
+        baseline = baseline if baseline else mean
+
+        # models unavailable on this build fall back to single threaded
+        name = model if result["model"] == model else "{0}*".format(model)
+
+        print("{0:<12}{1:>10.3f}{2:>10.3f}{3:>10.3f}{4:>10.3f}{5:>9.2f}x".format(
+              name if name else "Single",
+              mean * 1000,
+              percentile(times, 50) * 1000,
+              percentile(times, 95) * 1000,
+              percentile(times, 99) * 1000,
+              baseline / mean))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,12 @@
+import time
+
+# time to first frame is measured from here, before anything else is imported
+start_time = time.perf_counter()
+
 import argparse
 import os
 import sys
 
-import panda3d.core as p3d
 from pathlib import Path
 
 current_script_path = os.path.realpath(__file__)
@@ -10,7 +14,9 @@ current_dir = os.path.dirname(current_script_path)
 editor_path = os.path.join(current_dir, "src")
 sys.path.append(editor_path)
 
-from demon import Demon
+from startupReport import startup_report
+
+startup_report.set_start_time(start_time)
 
 
 # command line arguments parser
@@ -18,17 +24,61 @@ parser = argparse.ArgumentParser()
 parser.add_argument("-demo", "--Demo")
 parser.add_argument("-le", "--LE")
 parser.add_argument("-projpath", "--ProjPath")
+parser.add_argument("-headless", "--Headless", action="store_true",
+                    help="render into an offscreen buffer, no window is created")
+parser.add_argument("-frames", "--Frames", type=int,
+                    help="exit after running this many frames")
+parser.add_argument("-fps", "--FPS", type=int,
+                    help="target frame rate, 0 runs unpaced")
+parser.add_argument("-ondemand", "--OnDemand", action="store_true",
+                    help="only render frames when something has changed")
+parser.add_argument("-threading", "--Threading", default="",
+                    help="render pipeline threading model, '', '/Draw', 'Cull' or 'Cull/Draw'")
+parser.add_argument("-startup-report", "--startup-report", action="store_true",
+                    dest="StartupReport",
+                    help="print time taken by imports and init phases till first frame")
+parser.add_argument("-profile", "--Profile", nargs="?", const="frame_trace.json",
+                    help="record frame phase timings, saved as chrome trace on exit")
+parser.add_argument("-hitch", "--Hitch", nargs="?", type=float, const=100.0,
+                    help="sample stacks of frames longer than given milliseconds, saved in 'hitches'")
+parser.add_argument("-pstats", "--PStats", nargs="?", const="pstats_capture.json",
+                    help="capture pstats collector times, summary saved as json on exit")
+parser.add_argument("-pstats-server", "--pstats-server", nargs="?", const="localhost",
+                    dest="PStatsServer",
+                    help="send pstats collector times to a PStats server on given host")
+parser.add_argument("-memory", "--Memory", action="store_true",
+                    help="trace python allocations, F8 prints memory by subsystem and diff to previous")
+parser.add_argument("-trace-events", "--trace-events", nargs="?", const="event_trace.csv",
+                    dest="TraceEvents",
+                    help="count events and time their handlers, saved as csv or json on exit")
+parser.add_argument("-stats", "--Stats", action="store_true",
+                    help="show frame statistics overlay at startup, toggled with F3")
+parser.add_argument("-record", "--Record",
+                    help="record mouse and keyboard input to given session file")
+parser.add_argument("-playback", "--Playback",
+                    help="play back input from given session file, headless runs exit when it ends")
+parser.add_argument("-isolated", "--Isolated", action="store_true",
+                    help="run game in a child process when played, see PlayProcess")
+parser.add_argument("-control", "--Control",
+                    help="start json-rpc control server on 'host:port', 'port' or a unix socket path")
 
 # AnimatedCharacter": demos.AnimatedCharacter
 demos = {}
 
 
+# parse input arguments
+cmd_args = parser.parse_args()
+
+# start timing imports before editor modules are imported
+if cmd_args.StartupReport:
+    startup_report.enable()
+
+from demon import Demon
+
+
 class DemonApp(Demon):    
     def __init__(self, *args, **kwargs):
         
-        # parse input arguments
-        cmd_args = parser.parse_args()
-        
         # check if user defined project project path exists,
         # otherwise use default
         if cmd_args.ProjPath:
@@ -41,8 +91,33 @@ class DemonApp(Demon):
             proj_path = os.path.join(current_dir, "defaultProject")
 
         # start demon
-        Demon.__init__(self, proj_path, *args, **kwargs)
+        Demon.__init__(self, proj_path, *args, headless=cmd_args.Headless,
+                       target_fps=cmd_args.FPS,
+                       on_demand_rendering=cmd_args.OnDemand,
+                       threading_model=cmd_args.Threading,
+                       show_stats=cmd_args.Stats, **kwargs)
                 
+        if cmd_args.Hitch:
+            self.engine.hitch_detector.budget = cmd_args.Hitch / 1000
+            self.engine.hitch_detector.enable()
+
+        if cmd_args.Profile:
+            self.engine.profiler.trace_path = cmd_args.Profile
+            self.engine.profiler.enable()
+
+        if cmd_args.TraceEvents:
+            self.event_tracer.trace_path = cmd_args.TraceEvents
+            self.event_tracer.enable()
+
+        if cmd_args.Memory:
+            self.memory_report.enable()
+
+        if cmd_args.PStats:
+            self.engine.pstats_recorder.start_capture(cmd_args.PStats)
+
+        if cmd_args.PStatsServer:
+            self.engine.pstats_recorder.connect(cmd_args.PStatsServer)
+
         # load the demo program if specified in input args
         if cmd_args.Demo:
             demo = None
@@ -63,6 +138,24 @@ class DemonApp(Demon):
             self.start_level_editor()
             self.on_dir_event()
 
+        self.game.isolated_play = cmd_args.Isolated
+
+        if cmd_args.Control:
+            self.start_control_server(cmd_args.Control)
+
+        # input sessions start after everything is loaded, so recorded and
+        # replayed input both begin at the same frame.
+        if cmd_args.Playback:
+            self.engine.input_recorder.begin_playback(cmd_args.Playback)
+        elif cmd_args.Record:
+            self.engine.input_recorder.begin_record(cmd_args.Record)
+
+    def on_update(self):
+        # a replayed session is usually a benchmark, stop once it ends
+        if cmd_args.Playback and cmd_args.Headless and \
+                not self.engine.input_recorder.is_playing:
+            self.exit()
+
 
 app = DemonApp()
-app.run()
+app.run(max_frames=cmd_args.Frames)
@@ -0,0 +1,125 @@
+import time
+
+
+class AsyncLoop(object):
+    """An asyncio event loop driven by the engine's frame loop, instead of
+    running forever, the loop is stepped each frame for at most a given time
+    budget, so coroutines awaiting I/O, timers or executor futures never stall
+    rendering.
+
+    asyncio is only imported and the loop created when first used, so it
+    costs nothing at startup or per frame if no coroutines are ever run."""
+
+    def __init__(self, budget=0.002, max_workers=None):
+        object.__init__(self)
+
+        self.budget = budget  # max seconds spent running the loop per frame
+        self.__max_workers = max_workers
+
+        self.__executor = None
+        self.__loop = None
+
+    def __create_loop(self):
+        import asyncio
+        from concurrent.futures import ThreadPoolExecutor
+
+        self.__executor = ThreadPoolExecutor(max_workers=self.__max_workers,
+                                             thread_name_prefix="AsyncLoopWorker")
+
+        class SliceLoop(asyncio.SelectorEventLoop):
+            # keeps its own record of callbacks scheduled with call_soon,
+            # which includes steps of tasks and done callbacks of futures,
+            # so run_slice knows when there is no ready work left.
+            def __init__(self):
+                asyncio.SelectorEventLoop.__init__(self)
+                self.soon = []  # [handle, callback], handle is None once run
+
+            def call_soon(self, callback, *args, context=None):
+                entry = [None, callback]
+                entry[0] = asyncio.SelectorEventLoop.call_soon(
+                    self, self.__run_soon, entry, *args, context=context)
+                self.soon.append(entry)
+                return entry[0]
+
+            @staticmethod
+            def __run_soon(entry, *args):
+                entry[0] = None
+                entry[1](*args)
+
+            def has_ready(self):
+                self.soon = [entry for entry in self.soon
+                             if entry[0] is not None and not entry[0].cancelled()]
+                return bool(self.soon)
+
+        self.__loop = SliceLoop()
+        self.__loop.set_default_executor(self.__executor)
+        asyncio.set_event_loop(self.__loop)
+
+    def create_task(self, coro):
+        """Schedules a coroutine to be run on the loop, returns the task."""
+        task = self.loop.create_task(coro)
+        task.add_done_callback(self.__on_task_done)
+        return task
+
+    def run_in_executor(self, func, *args):
+        """Runs func in a worker thread, returns an awaitable future."""
+        return self.loop.run_in_executor(None, func, *args)
+
+    def run_slice(self, budget=None):
+        """Runs ready callbacks of the loop until there are none left or time
+        budget has been spent, never blocks waiting for I/O."""
+
+        loop = self.__loop
+        if loop is None:
+            return
+
+        budget = self.budget if budget is None else budget
+        deadline = time.perf_counter() + budget
+
+        while True:
+            # stop is processed at end of the current iteration, I/O is polled
+            # with zero timeout since stop callback is already ready.
+            loop.call_soon(loop.stop)
+            loop.run_forever()
+
+            if not loop.has_ready() or time.perf_counter() >= deadline:
+                break
+
+    def close(self):
+        """Cancels all pending tasks and shuts down the loop and executor."""
+
+        loop = self.__loop
+        if loop is None or loop.is_closed():
+            return
+
+        import asyncio
+        tasks = asyncio.all_tasks(loop)
+        for task in tasks:
+            task.cancel()
+
+        if tasks:
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        self.__executor.shutdown(wait=False)
+        loop.close()
+
+    def __on_task_done(self, task):
+        if task.cancelled():
+            return
+
+        exception = task.exception()
+        if exception is not None:
+            print(exception)
+
+    @property
+    def loop(self):
+        if self.__loop is None:
+            self.__create_loop()
+        return self.__loop
+
+    @property
+    def executor(self):
+        if self.__loop is None:
+            self.__create_loop()
+        return self.__executor
@@ -0,0 +1,332 @@
+import asyncio
+import json
+import gc
+import inspect
+import panda3d.core as p3d
+
+
+# json-rpc 2.0 error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+SERVER_ERROR = -32000
+
+
+class ControlError(Exception):
+    """Raised by command handlers, sent back to client as a json-rpc error."""
+
+    def __init__(self, message, code=SERVER_ERROR):
+        Exception.__init__(self, message)
+        self.code = code
+
+
+class ControlServer(object):
+    """A JSON-RPC 2.0 server on a local TCP or unix socket, for driving a
+    running editor from test rigs and asset pipelines.
+
+    Requests are newline delimited json objects. The server runs on demon's
+    asyncio loop, which is stepped on the main thread each frame, so command
+    handlers can safely touch the scene graph and the editor. Per frame cost
+    is bounded by the loop's time budget and by max_requests, requests over
+    that are handled on following frames.
+
+    Handlers are called with json-rpc params, as positional arguments for a
+    list and keyword arguments for an object, a handler may be a coroutine
+    function, e.g. step awaits given number of frames."""
+
+    def __init__(self, demon, max_requests=8):
+        object.__init__(self)
+
+        self.__demon = demon
+        self.max_requests = max_requests  # requests handled per frame
+
+        self.__server = None
+        self.__address = None
+        self.__handlers = {}
+
+        self.__requests = 0      # requests handled this frame
+        self.__frame_waiters = []  # (frame count, future)
+
+        self.register("list_methods", self.list_methods)
+        self.register("ping", lambda: "pong")
+        self.register("open_project", self.open_project)
+        self.register("load_model", self.load_model)
+        self.register("start_game", self.start_game)
+        self.register("stop_game", self.stop_game)
+        self.register("select", self.select)
+        self.register("step", self.step)
+        self.register("frame_stats", self.frame_stats)
+        self.register("node_count", self.node_count)
+        self.register("memory", self.memory)
+
+    def register(self, method, handler):
+        self.__handlers[method] = handler
+
+    def unregister(self, method):
+        if method in self.__handlers:
+            del self.__handlers[method]
+
+    def start(self, address):
+        """Starts listening on address, "host:port" or "port" for TCP, a
+        path for a unix socket, TCP servers only bind to localhost unless
+        a host is given."""
+
+        loop = self.__demon.async_loop.loop
+
+        address = str(address)
+        if "/" in address or "\\" in address:
+            coro = asyncio.start_unix_server(self.__on_client, path=address)
+        else:
+            host, _, port = address.rpartition(":")
+            coro = asyncio.start_server(self.__on_client, host or "127.0.0.1", int(port))
+
+        self.__server = loop.run_until_complete(coro)
+        self.__address = address
+        self.__demon.engine.add_update_callback(self.update)
+
+        print("-- Control server listening on {0}".format(self.get_address()))
+
+    def stop(self):
+        if self.__server is None:
+            return
+
+        self.__server.close()
+        self.__server = None
+
+        for frame, future in self.__frame_waiters:
+            if not future.done():
+                future.cancel()
+        self.__frame_waiters.clear()
+
+    def get_address(self):
+        """Returns address server is listening on, for TCP this is the
+        actual (host, port), useful when started on port 0."""
+        if self.__server is None:
+            return None
+
+        sockets = self.__server.sockets
+        return sockets[0].getsockname() if sockets else self.__address
+
+    def update(self):
+        """Should be called once each frame, from main thread."""
+        self.__requests = 0
+
+        if not self.__frame_waiters:
+            return
+
+        frame = self.__demon.frame_count
+        waiting = []
+
+        for item in self.__frame_waiters:
+            if frame >= item[0]:
+                if not item[1].done():
+                    item[1].set_result(frame)
+            else:
+                waiting.append(item)
+
+        self.__frame_waiters = waiting
+
+    def wait_frames(self, frames=1):
+        """Returns a future resolved once given number of frames have been
+        run."""
+        future = self.__demon.async_loop.loop.create_future()
+        self.__frame_waiters.append((self.__demon.frame_count + frames, future))
+        return future
+
+    async def __on_client(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+
+                if not line.strip():
+                    continue
+
+                # over this frame's quota, continue next frame
+                while self.__requests >= self.max_requests:
+                    await self.wait_frames(1)
+                self.__requests += 1
+
+                response = await self.__handle(line)
+                if response is not None:
+                    writer.write(json.dumps(response).encode("utf-8") + b"\n")
+                    await writer.drain()
+
+        except ConnectionError:
+            pass
+
+        # editor is shutting down, streams log a spurious error for client
+        # tasks that end cancelled
+        except asyncio.CancelledError:
+            pass
+
+        finally:
+            writer.close()
+
+    async def __handle(self, line):
+        try:
+            request = json.loads(line)
+        except ValueError as error:
+            return self.__error(None, PARSE_ERROR, str(error))
+
+        if not isinstance(request, dict) or not isinstance(request.get("method"), str):
+            return self.__error(None, INVALID_REQUEST, "Invalid request")
+
+        response = await self.__call(request)
+
+        # notifications, requests without an id, get no response, not even
+        # errors
+        if "id" not in request:
+            return None
+        return response
+
+    async def __call(self, request):
+        request_id = request.get("id")
+        method = request["method"]
+        params = request.get("params", [])
+
+        handler = self.__handlers.get(method)
+        if handler is None:
+            return self.__error(request_id, METHOD_NOT_FOUND,
+                                "Method '{0}' not found".format(method))
+
+        # only params that don't fit the handler's signature are invalid,
+        # a TypeError raised by the handler itself is an internal error
+        try:
+            if isinstance(params, dict):
+                bound = inspect.signature(handler).bind(**params)
+            elif isinstance(params, list):
+                bound = inspect.signature(handler).bind(*params)
+            else:
+                raise TypeError("params must be an array or an object")
+        except TypeError as error:
+            return self.__error(request_id, INVALID_PARAMS, str(error))
+
+        try:
+            result = handler(*bound.args, **bound.kwargs)
+
+            if hasattr(result, "__await__"):
+                result = await result
+
+        except ControlError as error:
+            return self.__error(request_id, error.code, str(error))
+
+        except Exception as error:
+            return self.__error(request_id, INTERNAL_ERROR,
+                                "{0}: {1}".format(type(error).__name__, error))
+
+        return {"jsonrpc": "2.0", "id": request_id, "result": result}
+
+    @staticmethod
+    def __error(request_id, code, message):
+        return {"jsonrpc": "2.0", "id": request_id,
+                "error": {"code": code, "message": message}}
+
+    # ----------------------------------------------------------------------
+    # commands
+
+    def list_methods(self):
+        return sorted(self.__handlers.keys())
+
+    def open_project(self, path):
+        self.__demon.set_project(path)
+        self.__demon.on_dir_event()
+        return self.__demon.project.path
+
+    def load_model(self, path, parent=None):
+        """loads a model and adds it to editor's scene, returns its name"""
+        render = self.__demon.engine.render
+
+        if parent:
+            parent_np = render.find("**/" + parent)
+            if parent_np.isEmpty():
+                raise ControlError("Parent '{0}' not found".format(parent))
+        else:
+            parent_np = render
+
+        np = self.__demon.engine.resource_handler.load_model(path)
+        if np is None:
+            raise ControlError("Unable to load model '{0}'".format(path))
+
+        np.reparentTo(parent_np)
+        self.__demon.engine.mark_dirty()
+        return np.getName()
+
+    def start_game(self):
+        self.__demon.game.start()
+        return self.__demon.game.is_running()
+
+    def stop_game(self):
+        self.__demon.game.stop()
+        return self.__demon.game.is_running()
+
+    def select(self, names, append=False):
+        """selects nodes with given names, returns number of nodes selected"""
+        le = self.__demon.le
+        if le is None:
+            raise ControlError("Level editor is not running")
+
+        if isinstance(names, str):
+            names = [names]
+
+        render = self.__demon.engine.render
+        nps = []
+        for name in names:
+            nps.extend(render.findAllMatches("**/" + name))
+
+        le.select(nps, append)
+        return len(le.selected_nps)
+
+    async def step(self, frames=1):
+        """returns once given number of frames have been run"""
+        return await self.wait_frames(max(1, int(frames)))
+
+    def frame_stats(self):
+        demon = self.__demon
+        clock = p3d.ClockObject.getGlobalClock()
+        pacer = demon.frame_pacer
+        p50, p95, p99 = demon.stats_hud.get_percentiles(50, 95, 99)
+
+        return {"frame": demon.frame_count,
+                "dt": clock.getDt(),
+                "average_fps": clock.getAverageFrameRate(),
+                "p50": p50,
+                "p95": p95,
+                "p99": p99,
+                "work_time": pacer.work_time,
+                "slack": pacer.slack,
+                "average_slack": pacer.average_slack,
+                "overruns": pacer.overruns,
+                "tasks": p3d.AsyncTaskManager.getGlobalPtr().getNumTasks(),
+                "gc": demon.gc_manager.get_stats()}
+
+    def node_count(self):
+        render = self.__demon.engine.render
+        geom_nodes = render.findAllMatches("**/+GeomNode")
+
+        return {"nodes": render.node().countNumDescendants(),
+                "geom_nodes": geom_nodes.getNumPaths(),
+                "geoms": sum(np.node().getNumGeoms() for np in geom_nodes)}
+
+    def memory(self):
+        # objects frozen by GCManager are left out of gc.get_objects
+        result = {"python_objects": len(gc.get_objects()) + gc.get_freeze_count(),
+                  "gc_counts": gc.get_count()}
+
+        try:
+            import resource
+        except ImportError:
+            resource = None
+
+        if resource is not None:
+            # kilobytes on linux, bytes on macos
+            result["max_rss"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+        import tracemalloc
+        if tracemalloc.is_tracing():
+            result["traced_current"], result["traced_peak"] = tracemalloc.get_traced_memory()
+
+        return result
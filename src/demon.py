@@ -1,35 +1,102 @@
 import math
+import types
 import panda3d.core as p3d
-from eventManager import EventManager
+from eventManager import EventManager, change_notifier
 from engine import Engine
+from framePacer import FramePacer
+from asyncLoop import AsyncLoop
+from gcManager import GCManager
+from statsHud import StatsHud
+from workProgressBar import WorkProgressBar
+from eventTracer import EventTracer, SOURCE_PANDA
 from game import Game
 from project import Project
 from system import Systems
 from levelEditor import LevelEditor
+from startupReport import startup_report
 
 
 class Demon(object):
-    def __init__(self, proj_path=False, **kwargs):
+    def __init__(self, proj_path=False, headless=False, target_fps=None,
+                 on_demand_rendering=False, threading_model="", manage_gc=True,
+                 show_stats=False, watch_project=True, **kwargs):
         object.__init__(self)
         self.__is_closed = False
+        self.__frame_count = 0
+        self.__watch_project = watch_project  # reload scripts when project changes
                 
         # initialize event handler for python side event handling
         self.__event_manager = EventManager()
-        self.__evt_map = {}  # evt_map[evt_name] = (call, list_args)
+        # evt_map[evt_name] = {token: (callback, args, has_callable_args, pass_params)},
+        # dispatch[evt_name] is a tuple of its values, rebuilt on change, so
+        # handlers can accept or ignore while an event is being dispatched.
+        self.__evt_map = {}
+        self.__dispatch = {}
+        self.__tokens = {}  # token: evt_name
+        self.__next_token = 1
         
         # init the engine
-        self.__engine = Engine()
+        with startup_report.phase("Engine.__init__"):
+            self.__engine = Engine(headless=headless,
+                                   on_demand_rendering=on_demand_rendering,
+                                   threading_model=threading_model)
         self.__engine.set_event_hook(self.on_any_event)
+        self.__engine.set_event_flush_hook(self.__flush_events)
         # self.__engine.add_update_callback(self.on_update)
+
+        # headless runs are usually benchmarks, run these at full speed
+        # unless a frame rate is explicitly asked for, 0 disables pacing.
+        if target_fps is None:
+            target_fps = 0 if headless else 60
+
+        self.__frame_pacer = FramePacer(self.__engine.win, target_fps=target_fps)
+
+        # asyncio loop stepped once each frame, for coroutines started by
+        # scripts or async event handlers
+        self.__async_loop = AsyncLoop()
+
+        # json-rpc server for automation, see start_control_server
+        self.__control_server = None
+
+        # run full garbage collections in frame slack instead of whenever
+        # python decides to
+        self.__gc_manager = GCManager(profiler=self.__engine.profiler)
+        if manage_gc:
+            self.__gc_manager.enable()
+
+        # frame statistics overlay, samples are collected even when hidden
+        self.__stats_hud = StatsHud(self.__engine, self.__frame_pacer)
+        self.__engine.add_update_callback(self.__stats_hud.update)
+        self.__engine.add_redraw_check(self.is_stats_hud_visible)
+        if show_stats:
+            self.__stats_hud.show()
+
+        # progress of time sliced jobs of engine's work queue
+        self.__progress_bar = WorkProgressBar(self.__engine)
+        self.__engine.add_update_callback(self.__progress_bar.update)
+
+        # memory use by subsystem, snapshots are taken with F8, created on
+        # first use
+        self.__memory_report = None
+
+        # event counts and handler times, off unless enabled
+        self.__event_tracer = EventTracer(self)
         
         # project
         self.__game = Game(self)
-        self.__game.init()
+        with startup_report.phase("Game.init"):
+            self.__game.init()
+
+        # running game scripts may change anything, keep redrawing
+        self.__engine.add_redraw_check(self.__game.is_running)
         self.__project = Project(self)
         
         # initialize project and game related systems
-        self.set_project(proj_path)
-        self.create_default_scene()
+        with startup_report.phase("Project.set_project"):
+            self.set_project(proj_path)
+
+        with startup_report.phase("Demon.create_default_scene"):
+            self.create_default_scene()
         
         # some other defaults
         self.__coll_trav = p3d.CollisionTraverser()
@@ -62,27 +129,83 @@ class Demon(object):
                                 
         # accept events
         self.accept("space", self.__game.start)
+        self.accept("f9", self.__engine.profiler.dump)
+        self.accept("shift-f9", self.__engine.profiler.toggle)
+        self.accept("f3", self.toggle_stats_hud)
+        self.accept("f8", self.report_memory)
                                 
         # other
         self.__default_sun = False
         self.__shift = False
+
+        # everything loaded so far lives as long as the editor
+        self.__gc_manager.freeze()
         
-    def run(self):
-        while not self.__engine.win.isClosed():
+    def run(self, max_frames=None):
+        """Runs the main loop until the window is closed or exit is called,
+        if max_frames is given, the loop stops after that many frames,
+        this is mostly useful for headless (batch, benchmark) runs."""
+
+        mouse = self.__engine.mouse
+
+        while not self.__is_closed and not self.__engine.is_closed():
             self.__engine.update()
             self.on_update()
 
+            # things not needed to render the first frame are started
+            # right after it
+            if self.__frame_count == 0:
+                startup_report.on_first_frame()
+                if self.__watch_project:
+                    self.__project.start_dir_watcher()
+
+            self.__async_loop.run_slice()
+
+            self.__frame_count += 1
+            if max_frames is not None and self.__frame_count >= max_frames:
+                break
+
+            if mouse.dx or mouse.dy:
+                self.__frame_pacer.notify_activity()
+
+            self.__gc_manager.update(self.__frame_pacer.time_left())
+            self.__frame_pacer.wait()
+
+        if self.__engine.profiler.enabled:
+            self.__engine.profiler.dump()
+
+        self.__engine.pstats_recorder.stop_capture()
+
+        if self.__event_tracer.enabled:
+            self.__event_tracer.save()
+        self.__engine.pstats_recorder.disconnect()
+
+        if self.__control_server:
+            self.__control_server.stop()
+
+        # a recorded session is only written to its file once closed
+        self.__engine.input_recorder.stop()
+
+        self.__game.shutdown()
+
+        # worker threads of task chains scripts have put tasks on
+        p3d.AsyncTaskManager.getGlobalPtr().stopThreads()
+        self.__engine.dispatcher.clear()
+
+        self.__async_loop.close()
+
     def on_update(self):
         pass
 
     def exit(self):
-        pass
+        self.__is_closed = True
 
     def on_dir_event(self):
         paths = self.__project.get_all_scripts()
         runtimescripts, comps = self.engine.resource_handler.load_scripts(paths)
         self.__game.set_runtime_scripts(runtimescripts)
         self.__game.set_components(comps)
+        self.__gc_manager.freeze()
 
     def set_project(self, proj_path):
         self.__project.set_project(proj_path)
@@ -94,64 +217,167 @@ class Demon(object):
         
     def start_level_editor(self):
         self.__le = LevelEditor(self)
-        self.__le.init()
+        with startup_report.phase("LevelEditor.init"):
+            self.__le.init()
+        self.__gc_manager.freeze()
         
-    def accept(self, evt, callback, *args):
+    def start_control_server(self, address):
+        """Starts a json-rpc server on a local socket, see ControlServer."""
+        if self.__control_server is None:
+            from controlServer import ControlServer
+            self.__control_server = ControlServer(self)
+
+        self.__control_server.start(address)
+        return self.__control_server
+
+    def report_memory(self):
+        self.memory_report.report()
+
+    def toggle_stats_hud(self):
+        self.__stats_hud.toggle()
+        self.__engine.mark_dirty()
+
+    def is_stats_hud_visible(self):
+        return not self.__stats_hud.isHidden()
+
+    def accept(self, evt, callback, *args, pass_params=False):
+        """Calls callback with args when evt is sent, args that are callables
+        are replaced with their results each time the event is sent, if
+        pass_params is True, event's own parameters follow args.
+        Returns a token for ignore."""
+
         if not isinstance(evt, str) or not callable(callback):
            print("Incorret arguments to demon.accept")
-           return
-            
-        if not self.__evt_map.__contains__(evt):
-            self.__evt_map[evt] = []
+           return None
 
-        self.__evt_map[evt].append((callback, args))
-        
-        return len(self.__evt_map[evt]) - 1
+        token = self.__next_token
+        self.__next_token += 1
+
+        has_callable_args = any(callable(arg) for arg in args)
+
+        self.__evt_map.setdefault(evt, {})[token] = (callback, args, has_callable_args,
+                                                     pass_params)
+        self.__tokens[token] = evt
+        self.__update_dispatch(evt)
+
+        return token
         
-    def ignore(self, evt, id):
-        if self.__evt_map.__contains__(evt) and id < len(self.__evt_map[evt]): 
-           self.__evt_map[evt].pop(id)
+    def ignore(self, evt, token=None):
+        """Removes handler with given token, token may also be passed as
+        only argument, if token is None all handlers of evt are removed."""
+
+        if token is None and not isinstance(evt, str):
+            evt, token = self.__tokens.get(evt), evt
+
+        handlers = self.__evt_map.get(evt)
+        if handlers is None:
+            return
+
+        if token is None:
+            for token in handlers:
+                del self.__tokens[token]
+            handlers.clear()
+        elif token in handlers:
+            del handlers[token]
+            del self.__tokens[token]
+
+        self.__update_dispatch(evt)
 
-    def on_any_event(self, evt, *args):
+    def __update_dispatch(self, evt):
+        handlers = self.__evt_map[evt]
+
+        if handlers:
+            self.__dispatch[evt] = tuple(handlers.values())
+        else:
+            del self.__evt_map[evt]
+            self.__dispatch.pop(evt, None)
+
+        wants_params = any(handler[3] for handler in handlers.values())
+        self.__engine.set_event_params_wanted(evt, wants_params)
+
+    def __flush_events(self):
+        # events queued this frame, then batched changes of observables
+        self.__event_manager.flush()
+        change_notifier.flush()
+
+        # frame's events are all dispatched, tracer's frame ends here
+        if self.__event_tracer.enabled:
+            self.__event_tracer.update()
+
+    def on_any_event(self, evt, params=()):
         """event sent from c++ side can be handled here"""
         
-        '''
-        if evt.name == "TaskManager-addTask":
-           print("%s%s" % ("added", args))
-        elif evt.name == "TaskManager-removeTask":
-           print("%s%s" % ("removed", args))
-        '''
-                
-        if evt.name == "window-event":
-           self.__game.on_resize_event()
+        self.__frame_pacer.notify_activity()
+        
+        name = evt.name
+        tracer = self.__event_tracer if self.__event_tracer.enabled else None
+
+        if name == "window-event":
+            if tracer:
+                tracer.call(SOURCE_PANDA, name, self.__game.on_resize_event)
+            else:
+                self.__game.on_resize_event()
         
-        if evt.name in self.__evt_map.keys():
-            res = self.__evt_map[evt.name]
+        handlers = self.__dispatch.get(name)
+        if handlers is None:
+            return
 
-            has_callable_arguments = False
+        if tracer:
+            tracer.count(SOURCE_PANDA, name)
 
-            for i in range(len(res)):
-                callback = res[i][0]
-                args = res[i][1]
+        for callback, args, has_callable_args, pass_params in handlers:
+            # callable arguments are replaced with their results
+            if has_callable_args:
+                args = tuple(val() if callable(val) else val for val in args)
 
-                for j in range(len(args)):
-                    if callable(args[j]):
-                        has_callable_arguments = True
-                        break
+            if pass_params:
+                args = (*args, *params)
 
-                # if we have callables arguments replace them with the result from callable
-                if has_callable_arguments:
-                    args = tuple(val() if callable(val) else val for val in args)
+            if tracer:
+                result = tracer.call(SOURCE_PANDA, name, callback, *args)
+            else:
+                result = callback(*args)
 
-                if args is not None and len(args) > 0:
-                    callback(*args)
-                else:
-                    callback()
+            # async handlers are scheduled on the asyncio loop
+            if isinstance(result, types.CoroutineType):
+                self.__async_loop.create_task(result)
 
     @property
     def event_manager(self):
         return self.__event_manager
 
+    @property
+    def async_loop(self):
+        return self.__async_loop
+
+    @property
+    def control_server(self):
+        return self.__control_server
+
+    @property
+    def event_tracer(self):
+        return self.__event_tracer
+
+    @property
+    def gc_manager(self):
+        return self.__gc_manager
+
+    @property
+    def memory_report(self):
+        # tracemalloc and snapshot code are only imported once needed
+        if self.__memory_report is None:
+            from memoryReport import MemoryReport
+            self.__memory_report = MemoryReport(self)
+        return self.__memory_report
+
+    @property
+    def stats_hud(self):
+        return self.__stats_hud
+
+    @property
+    def frame_pacer(self):
+        return self.__frame_pacer
+
     @property
     def engine(self):
         return self.__engine
@@ -171,3 +397,7 @@ class Demon(object):
     @property
     def is_closed(self):
         return self.__is_closed
+
+    @property
+    def frame_count(self):
+        return self.__frame_count
@@ -3,6 +3,7 @@ import threading
 from pathlib import Path
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
+from utils.mainThreadDispatcher import main_dispatcher
 
 
 class DirEventProcessor(FileSystemEventHandler):
@@ -46,8 +47,11 @@ class DirEventProcessor(FileSystemEventHandler):
             # print("DirWatcher Timer stopped.")
 
     def reset(self):
+        # called from timer thread, callback reloads scripts and changes
+        # game state, so it is run on main thread, once even if changes
+        # came in again before it ran
         if self.__any_evt_callback:
-            self.__any_evt_callback()
+            main_dispatcher.post_coalesced(self, self.__any_evt_callback)
         self.__thread = None
 
 
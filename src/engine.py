@@ -3,11 +3,41 @@ import panda3d.core as p3d
 from sceneCam import SceneCamera
 from axisGrid import ThreeAxisGrid
 from resourceHandler import ResourceHandler
-from src.utils import Mouse
+from fixedStepScheduler import FixedStepScheduler
+from regionScheduler import RegionScheduler
+from inputRecorder import InputRecorder
+from workQueue import WorkQueue
+from hitchDetector import HitchDetector
+from pstatsRecorder import pstats_recorder
+from profiler import FrameProfiler, PHASE_FIXED_UPDATE, PHASE_TASKS, PHASE_DATA_GRAPH, \
+    PHASE_EVENTS, PHASE_MOUSE, PHASE_SCENE_CAM, PHASE_CALLBACKS, PHASE_RENDER
+from utils import Mouse
+from utils.mainThreadDispatcher import main_dispatcher
+
+
+# pipes tried in order when running headless, the default pipe is tried
+# first, since it can usually create an offscreen buffer if a display is
+# available.
+HEADLESS_PIPES = ("p3headlessgl", "p3tinydisplay")
+
+# threading models for the render pipeline, see
+# https://docs.panda3d.org/1.10/python/programming/rendering-process/multithreaded-render-pipeline
+# app, cull and draw all on main thread
+THREADING_SINGLE = ""
+# cull on main thread, draw on its own thread
+THREADING_DRAW = "/Draw"
+# cull and draw together on one separate thread
+THREADING_CULL = "Cull"
+# cull and draw each on its own thread
+THREADING_CULL_DRAW = "Cull/Draw"
+
+THREADING_MODELS = (THREADING_SINGLE, THREADING_DRAW, THREADING_CULL,
+                    THREADING_CULL_DRAW)
 
 
 class Engine(object):
-    def __init__(self):
+    def __init__(self, headless=False, win_size=(800, 600), on_demand_rendering=False,
+                 threading_model=THREADING_SINGLE):
         object.__init__(self)
 
         # _______________________instance attributes_______________________
@@ -15,6 +45,9 @@ class Engine(object):
         self.__engine = None
         self.__pipe = None
         self.__win = None
+        self.__headless = headless
+        self.__win_size = win_size
+        self.__threading_model = threading_model
 
         # display region, cam, mouse_watcher_node for 3D rendering
         self.__dr = None
@@ -25,9 +58,17 @@ class Engine(object):
         # other fields
         self.__aspect_ratio = 1.0
         self.__evt_hook = None
+        self.__evt_flush_hook = None  # dispatches events queued during frame
+        self.__param_events = set()  # names of events hook wants parameters of
         self.__update_callbacks = []  # 
         self.__mouse_watchers = []
 
+        # on demand rendering, if enabled frames are only rendered when
+        # marked dirty or something in the scene graph changed.
+        self.__on_demand_rendering = on_demand_rendering
+        self.__dirty = True
+        self.__redraw_checks = []  # callables returning True if a redraw is needed
+
         # display region, cam, mouse_watcher_node for 2D rendering
         self.__dr2d = None
         self.__mouse_watcher_2d = None
@@ -36,6 +77,11 @@ class Engine(object):
         self.__cam2d = None
         # -----------------------___________________-----------------------
 
+        # input device node, this is either a MouseAndKeyboard or a
+        # VirtualMouse if engine is running headless
+        self.__input_node = None
+        self.__input_recorder = InputRecorder()
+
         # data root
         self.__data_root = p3d.NodePath('DataRoot')
         self.__data_graph_trav = p3d.DataGraphTraverser()
@@ -45,7 +91,13 @@ class Engine(object):
         self.__event_handler = p3d.EventHandler.getGlobalEventHandler()
 
         # initialize the engine and various systems
-        self.create_win()
+        self.set_threading_model(self.__threading_model)
+
+        if self.__headless:
+            self.create_offscreen_buffer()
+        else:
+            self.create_win()
+
         self.setup_input_handling()
         self.__mouse = Mouse(self.win, self.__mouse_watcher.node())
         self.create_3d_render()
@@ -55,6 +107,17 @@ class Engine(object):
         self.create_default_scene()
 
         self.__resource_handler = ResourceHandler()
+        self.__profiler = FrameProfiler()
+        self.__hitch_detector = HitchDetector()
+        self.__pstats_recorder = pstats_recorder
+        self.__profiling = False  # profiler, hitch detector and pstats
+        self.__watching = False   # recorder enabled at start of current
+        self.__pstats = False     # frame
+        self.__fixed_scheduler = FixedStepScheduler()
+        self.__region_scheduler = RegionScheduler()
+        self.__work_queue = WorkQueue()
+        self.__dispatcher = main_dispatcher
+        self.__clock = p3d.ClockObject.getGlobalClock()
 
         # scene camera needs some references not available at time of its creation,
         # so we set them now.
@@ -62,6 +125,7 @@ class Engine(object):
         
         # reset everything, 
         self.__scene_cam.reset()
+        self.on_evt_size()
         
         # reset clock
         self.reset_clock()
@@ -91,12 +155,120 @@ class Engine(object):
         self.__pipe = pipe
         self.__win = win
 
+    def create_offscreen_buffer(self):
+        """Creates an offscreen buffer instead of a window, this allows the
+        engine to run on machines without a display (render farms, CI boxes)."""
+
+        # there is nothing to sync to in an offscreen buffer
+        p3d.load_prc_file_data("", "sync-video false")
+
+        engine = p3d.GraphicsEngine.get_global_ptr()
+        selection = p3d.GraphicsPipeSelection.get_global_ptr()
+
+        fb_props = p3d.FrameBufferProperties()
+        fb_props.set_rgb_color(True)
+        fb_props.set_color_bits(3 * 8)
+        fb_props.set_depth_bits(24)
+
+        win_props = p3d.WindowProperties.size(*self.__win_size)
+
+        def pipes():
+            yield selection.make_default_pipe()
+            for mod in HEADLESS_PIPES:
+                yield selection.make_module_pipe(mod)
+
+        for pipe in pipes():
+            if not pipe or not pipe.is_valid():
+                continue
+
+            buffer = engine.make_output(pipe,
+                                        name="buffer",
+                                        sort=0,
+                                        fb_prop=fb_props,
+                                        win_prop=win_props,
+                                        flags=p3d.GraphicsPipe.BF_refuse_window)
+            if buffer:
+                print("-- Headless rendering using {0}".format(pipe.get_type().name))
+                self.__engine = engine
+                self.__pipe = pipe
+                self.__win = buffer
+                return
+
+        raise RuntimeError("Unable to create an offscreen buffer on any " +
+                           "graphics pipe.")
+
+    def set_threading_model(self, model):
+        """Sets the threading model of the render pipeline, this only affects
+        windows and buffers created after this call.
+        With a threaded model, scene graph changes made from the main thread
+        are pipelined and safe, changes made from any other thread must hold
+        the render_lock."""
+
+        if model and not p3d.Thread.is_true_threads():
+            print("-- Threading model '{0}' needs a panda3d build with true " \
+                  "threads, using single threaded pipeline".format(model))
+            model = THREADING_SINGLE
+
+        p3d.GraphicsEngine.get_global_ptr().set_threading_model(
+            p3d.GraphicsThreadingModel(model))
+
+        self.__threading_model = model
+
+    def sync_frame(self):
+        """Waits for the draw thread of a threaded pipeline to finish drawing
+        the last frame, call this before reading back rendered results."""
+        self.__engine.sync_frame()
+
     def add_update_callback(self, callback):
         if callback not in self.__update_callbacks:
             self.__update_callbacks.append(callback)
         else:
             pass
 
+    def remove_update_callback(self, callback):
+        if callback in self.__update_callbacks:
+            self.__update_callbacks.remove(callback)
+
+    def add_redraw_check(self, check):
+        """Adds a callable which is asked each frame, in on demand rendering
+        mode, whether the frame needs to be redrawn."""
+        if check not in self.__redraw_checks:
+            self.__redraw_checks.append(check)
+
+    def remove_redraw_check(self, check):
+        if check in self.__redraw_checks:
+            self.__redraw_checks.remove(check)
+
+    def mark_dirty(self):
+        """Requests the next frame to be rendered, when on demand rendering
+        is enabled."""
+        self.__dirty = True
+
+    def needs_redraw(self):
+        if self.__dirty:
+            return True
+
+        # any change to a node (transform, state, children) marks bounds of
+        # all its ancestors stale, cull traversal recomputes them, so a stale
+        # scene root means scene has changed since it was last drawn.
+        for dr in self.__win.get_active_display_regions():
+            cam = dr.get_camera()
+            if not cam.is_empty() and cam.get_top().node().is_bounds_stale():
+                return True
+
+        for check in self.__redraw_checks:
+            if check():
+                return True
+
+        return False
+
+    def set_on_demand_rendering(self, val):
+        self.__on_demand_rendering = val
+        self.__dirty = True
+
+        if not val:
+            self.__win.set_active(True)
+
     def create_3d_render(self):
         # create a new display region
         self.__dr = self.__win.make_display_region()
@@ -167,9 +339,18 @@ class Engine(object):
         self.__win.setActive(False)
         self.__engine.remove_window(self.__win)
 
+    def is_closed(self):
+        """Returns True if the main window has been closed, offscreen
+        buffers are never closed by the user."""
+        if self.__headless:
+            return not self.__win.is_valid()
+        return self.__win.isClosed()
+
     def on_evt_size(self):
-        props = self.__win.getProperties()
-        aspect = props.getXSize() / props.getYSize()
+        if self.__win.getYSize() == 0:
+            return 0
+
+        aspect = self.__win.getXSize() / self.__win.getYSize()
 
         if aspect == 0:
             return 0
@@ -191,14 +372,34 @@ class Engine(object):
         Stolen from direct.showbase.EventManager.py script.
         """
 
-        if not event.name:
+        name = event.name
+        if not name:
             print("Unnammed event from c++".format())
             return
 
-        if event.name == "window-event":
+        if name == "window-event":
             self.on_evt_size()
 
-        # parse event arguments
+        self.__dirty = True
+
+        # parameters are only converted to python for events a handler has
+        # asked them for, most events (mouse, keys) are handled without.
+        if name in self.__param_events:
+            param_list = self.get_event_params(event)
+        else:
+            param_list = ()
+
+        # send this evt to host application as well.
+        if self.__evt_hook:
+            self.__evt_hook(event, param_list)
+
+        # send the event down into C++ lands.
+        if self.__event_handler:
+            self.__event_handler.dispatchEvent(event)
+
+    @staticmethod
+    def get_event_params(event):
+        """Returns parameters of a c++ event converted to python values."""
         param_list = []
 
         for event_parameter in event.parameters:
@@ -222,13 +423,15 @@ class Engine(object):
 
             param_list.append(event_param_data)
 
-        # send this evt to host application as well.
-        if self.__evt_hook:
-            self.__evt_hook(event, param_list)
+        return param_list
 
-        # send the event down into C++ lands.
-        if self.__event_handler:
-            self.__event_handler.dispatchEvent(event)
+    def set_event_params_wanted(self, evt, wanted=True):
+        """Sets whether parameters of given event are converted to python
+        and passed to event hook, they are not by default."""
+        if wanted:
+            self.__param_events.add(evt)
+        else:
+            self.__param_events.discard(evt)
 
     def reset_clock(self):
         # make sure the globalClock object is exactly in sync with 
@@ -246,13 +449,24 @@ class Engine(object):
         p3d.AsyncTaskManager.getGlobalPtr().setClock(clock)
 
     def setup_input_handling(self):
-        mouse_and_keyboard = p3d.MouseAndKeyboard(self.__win, 0, "MouseAndKeyboard_01")
-        mk_node = self.__data_root.attachNewNode(mouse_and_keyboard)
+        if self.__headless:
+            # there is no window to read input from, use a virtual mouse
+            # instead, input can be injected into it directly.
+            input_node = p3d.VirtualMouse("VirtualMouse_01")
+            input_node.set_window_size(self.__win.getXSize(), self.__win.getYSize())
+        else:
+            input_node = p3d.MouseAndKeyboard(self.__win, 0, "MouseAndKeyboard_01")
+
+        mk_node = self.__data_root.attachNewNode(input_node)
+        self.__input_node = input_node
 
         mouse_watcher = p3d.MouseWatcher("MouseWatcher_01")
         mouse_watcher = mk_node.attachNewNode(mouse_watcher)
         mouse_watcher_node = mouse_watcher.node()
 
+        # input can be recorded or replaced with a recorded session
+        self.__input_recorder.attach(mk_node)
+
         button_thrower = p3d.ButtonThrower("Button_Thrower_01")
         button_thrower = mouse_watcher.attachNewNode(button_thrower)
 
@@ -286,16 +500,44 @@ class Engine(object):
     def set_event_hook(self, hook):
         self.__evt_hook = hook
 
+    def set_event_flush_hook(self, hook):
+        """hook is called once each frame, after update callbacks, to
+        dispatch events queued during the frame"""
+        self.__evt_flush_hook = hook
+
     def update(self):
+        # phases are timed for frame profiler, hitch detector and pstats
+        timing = self.__profiler.enabled or self.__hitch_detector.enabled or \
+            self.__pstats_recorder.enabled
+
+        if timing:
+            self.begin_frame_timing(self.__clock.getFrameCount())
+
+        # run fixed simulation steps due since last frame
+        self.__fixed_scheduler.update(self.__clock.getDt())
+
+        if timing:
+            self.mark_phase(PHASE_FIXED_UPDATE)
+
         # keep taskmanager updated
-        if self.__mouse_watcher.node().has_mouse():
-            p3d.AsyncTaskManager.getGlobalPtr().poll()
+        p3d.AsyncTaskManager.getGlobalPtr().poll()
+
+        # run calls other threads handed over to main thread, they may
+        # change the scene graph, so the frame is redrawn.
+        if self.__dispatcher.update():
+            self.__dirty = True
+
+        if timing:
+            self.mark_phase(PHASE_TASKS)
 
         # traverse the data graph.  This reads all the control
         # inputs (from the mouse and keyboard, for instance) and also
         # directly acts upon them (for instance, to move the avatar).
         self.__data_graph_trav.traverse(self.__data_root.node())
 
+        if timing:
+            self.mark_phase(PHASE_DATA_GRAPH)
+
         # process events
         isEmptyFunc = self.__event_queue.isQueueEmpty
         dequeueFunc = self.__event_queue.dequeueEvent
@@ -303,15 +545,87 @@ class Engine(object):
         while not isEmptyFunc():
             self.process_events(dequeueFunc())
 
+        if timing:
+            self.mark_phase(PHASE_EVENTS)
+
         # 
         self.__mouse.update()
+
+        if timing:
+            self.mark_phase(PHASE_MOUSE)
+
         self.__scene_cam.update()
 
-        for callback in self.__update_callbacks:
+        if timing:
+            self.mark_phase(PHASE_SCENE_CAM)
+
+        # callbacks may add or remove callbacks
+        for callback in tuple(self.__update_callbacks):
             callback()
 
-        # finally, render frame        
+        # dispatch python events queued this frame
+        if self.__evt_flush_hook:
+            self.__evt_flush_hook()
+
+        # resume time sliced jobs, they change the scene graph, so the
+        # frame is redrawn.
+        if self.__work_queue.update():
+            self.__dirty = True
+
+        if timing:
+            self.mark_phase(PHASE_CALLBACKS)
+
+        # activate display regions and buffers that are due this frame, their
+        # output is shown in the window, so it has to be redrawn too.
+        if self.__region_scheduler.update(only_changed=self.__on_demand_rendering):
+            self.__dirty = True
+
+        # finally, render frame, in on demand rendering mode, window is made
+        # inactive for frames that need no redraw, render_frame still ticks
+        # the clock and processes window events for it.
+        if self.__on_demand_rendering:
+            redraw = self.needs_redraw()
+            if redraw != self.__win.is_active():
+                self.__win.set_active(redraw)
+            self.__dirty = False
+
+        self.__input_recorder.record_frame()
         self.__engine.render_frame()
+        self.__input_recorder.play_frame()
+
+        if timing:
+            self.mark_phase(PHASE_RENDER)
+            self.end_frame_timing()
+
+    def begin_frame_timing(self, frame):
+        # any may be toggled during the frame, only those enabled at its
+        # start time it
+        self.__profiling = self.__profiler.enabled
+        self.__watching = self.__hitch_detector.enabled
+        self.__pstats = self.__pstats_recorder.enabled
+
+        if self.__profiling:
+            self.__profiler.begin_frame(frame)
+        if self.__watching:
+            self.__hitch_detector.begin_frame(frame)
+        if self.__pstats:
+            self.__pstats_recorder.begin_frame(frame)
+
+    def mark_phase(self, phase):
+        if self.__profiling:
+            self.__profiler.mark(phase)
+        if self.__watching:
+            self.__hitch_detector.mark(phase)
+        if self.__pstats:
+            self.__pstats_recorder.mark(phase)
+
+    def end_frame_timing(self):
+        if self.__profiling:
+            self.__profiler.end_frame()
+        if self.__watching:
+            self.__hitch_detector.end_frame()
+        if self.__pstats:
+            self.__pstats_recorder.end_frame()
 
     @property
     def aspect2d(self):
@@ -327,8 +641,7 @@ class Engine(object):
 
     @property
     def aspect_ratio(self):
-        props = self.__win.getProperties()
-        aspect = props.getXSize() / props.getYSize()
+        aspect = self.__win.getXSize() / self.__win.getYSize()
         self.__aspect_ratio = aspect
         return self.__aspect_ratio
 
@@ -344,10 +657,30 @@ class Engine(object):
     def engine(self):
         return self.__engine
 
+    @property
+    def fixed_scheduler(self):
+        return self.__fixed_scheduler
+
     @property
     def grid_np(self):
         return self.__grid_np
 
+    @property
+    def headless(self):
+        return self.__headless
+
+    @property
+    def hitch_detector(self):
+        return self.__hitch_detector
+
+    @property
+    def input_node(self):
+        return self.__input_node
+
+    @property
+    def input_recorder(self):
+        return self.__input_recorder
+
     @property
     def mouse(self):
         return self.__mouse
@@ -360,6 +693,36 @@ class Engine(object):
     def mouse_watchers(self):
         return self.__mouse_watchers
 
+    @property
+    def on_demand_rendering(self):
+        return self.__on_demand_rendering
+
+    @property
+    def render_lock(self):
+        """Held by the engine for the duration of render_frame, threads other
+        than main thread should hold this while modifying the scene graph."""
+        return self.__engine.get_render_lock()
+
+    @property
+    def threading_model(self):
+        return self.__threading_model
+
+    @property
+    def profiler(self):
+        return self.__profiler
+
+    @property
+    def pstats_recorder(self):
+        return self.__pstats_recorder
+
+    @property
+    def dispatcher(self):
+        return self.__dispatcher
+
+    @property
+    def region_scheduler(self):
+        return self.__region_scheduler
+
     @property
     def render(self):
         return self.__render
@@ -372,6 +735,10 @@ class Engine(object):
     def resource_handler(self):
         return self.__resource_handler
 
+    @property
+    def work_queue(self):
+        return self.__work_queue
+
     @property
     def win(self):
         return self.__win
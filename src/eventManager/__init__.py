@@ -5,5 +5,8 @@
 """
 
 from .eventManager import EventManager, EventNotFound, HandlerNotFound
+from .core import Observable, ChangeNotifier, change_notifier
+from .property import ObservableProperty
 
-__all__ = ["Observable", "EventNotFound", "HandlerNotFound"]
+__all__ = ["EventManager", "Observable", "ObservableProperty", "ChangeNotifier",
+           "change_notifier", "EventNotFound", "HandlerNotFound"]
@@ -0,0 +1,231 @@
+"""
+    Observable objects, change notifications of ObservableProperty fields.
+"""
+
+import typing as T
+import traceback
+
+from .property import ObservableProperty
+
+
+__all__ = ["Observable", "ChangeNotifier", "change_notifier"]
+
+
+# changes of an object since last flush, {field name: (old value, new value)}
+Changes = T.Dict[str, T.Tuple[T.Any, T.Any]]
+Observer = T.Callable[["Observable", Changes], T.Any]
+
+
+class ChangeNotifier:
+    """Collects objects whose observed fields changed, and notifies their
+    observers once per object on flush, which the editor calls once each
+    frame. Observers of all objects, e.g. autosave or undo, are registered
+    with observe_all."""
+
+    def __init__(self) -> None:
+        self._dirty = []   # type: T.List[Observable]
+        self._global = ()  # type: T.Tuple[Observer, ...]
+
+    def observe_all(self, callback: Observer) -> None:
+        """Calls callback(obj, changes) for changes of every observable,
+        while there are such observers, all observables track changes."""
+
+        if not self._global:
+            _start_tracking(Observable)
+        self._global = self._global + (callback,)
+
+    def unobserve_all(self, callback: Observer) -> None:
+        if callback not in self._global:
+            return
+
+        self._global = tuple(cb for cb in self._global if cb != callback)
+        if not self._global:
+            _stop_tracking(Observable)
+
+    def mark_dirty(self, obj: "Observable") -> None:
+        self._dirty.append(obj)
+
+    def flush(self) -> int:
+        """Notifies observers of objects changed since last flush, changes
+        made by observers are notified on next flush.
+        Returns number of objects notified."""
+
+        if not self._dirty:
+            return 0
+
+        dirty = self._dirty
+        self._dirty = []
+
+        notified = 0
+        for obj in dirty:
+            changes = obj._take_changes()
+            if not changes:
+                continue
+
+            notified += 1
+            for callback, fields in obj._get_observers():
+                if fields is not None:
+                    selected = {name: change for name, change in changes.items()
+                                if name in fields}
+                    if not selected:
+                        continue
+                else:
+                    selected = changes
+
+                try:
+                    callback(obj, selected)
+                except Exception:
+                    traceback.print_exc()
+
+            for callback in self._global:
+                try:
+                    callback(obj, changes)
+                except Exception:
+                    traceback.print_exc()
+
+        return notified
+
+
+# process wide instance, flushed once each frame by Demon
+change_notifier = ChangeNotifier()
+
+
+def _is_same(old: T.Any, new: T.Any) -> bool:
+    try:
+        return bool(old is new or old == new)
+    except Exception:
+        return False
+
+
+def _tracking_setattr(self: "Observable", name: str, value: T.Any) -> None:
+    """__setattr__ of observable classes while any of their instances is
+    observed, records changes of fields of observed objects."""
+
+    if name in self._observable_fields and \
+            (self.__dict__.get("_observers") or change_notifier._global):
+        old = self.__dict__.get(name)
+        if not _is_same(old, value):
+            self._record_change(name, old, value)
+
+    object.__setattr__(self, name, value)
+
+
+# class: number of observed objects, or 1 for global observers, tracking
+# __setattr__ is installed on these classes
+_tracked_classes = {}  # type: T.Dict[type, int]
+
+
+def _start_tracking(cls: type) -> None:
+    count = _tracked_classes.get(cls, 0)
+    if not count:
+        cls.__setattr__ = _tracking_setattr
+    _tracked_classes[cls] = count + 1
+
+
+def _stop_tracking(cls: type) -> None:
+    count = _tracked_classes.pop(cls, 0) - 1
+    if count > 0:
+        _tracked_classes[cls] = count
+    elif count == 0:
+        del cls.__setattr__
+
+
+class Observable:
+    """Base class for objects with ObservableProperty fields.
+
+    Fields are plain instance attributes. Changes are only tracked while
+    an object of the class is observed, a __setattr__ recording changes of
+    fields is then installed on the class, classes with no observed
+    objects pay nothing. Classes defining their own __setattr__, or
+    inheriting one, have it installed on Observable instead, their __setattr__ should call
+    super().__setattr__.
+    Changes are batched, observers are called at most once per object per
+    flush with all fields that changed since, {name: (old value, new
+    value)}, fields set back to their old value are left out."""
+
+    _observable_fields = {}  # type: T.Dict[str, ObservableProperty]
+
+    def __init_subclass__(cls, **kwargs: T.Any) -> None:
+        super().__init_subclass__(**kwargs)
+
+        fields = dict(cls._observable_fields)
+        for name, value in list(vars(cls).items()):
+            if isinstance(value, ObservableProperty):
+                fields[name] = value
+                delattr(cls, name)
+
+        cls._observable_fields = fields
+
+    def __new__(cls, *args: T.Any, **kwargs: T.Any) -> "Observable":
+        obj = super().__new__(cls)
+        for name, field in cls._observable_fields.items():
+            object.__setattr__(obj, name, field.make_default())
+        return obj
+
+    def __getstate__(self) -> T.Dict[str, T.Any]:
+        # observers and pending changes are not part of an object's state,
+        # pickled and copied objects are unobserved
+        state = self.__dict__.copy()
+        state.pop("_observers", None)
+        state.pop("_changes", None)
+        return state
+
+    def _get_tracked_class(self) -> type:
+        """Returns class tracking __setattr__ is installed on for this
+        object."""
+        # a __setattr__ installed on the class would hide one defined by it
+        # or any of its bases
+        cls = type(self)
+        for base in cls.__mro__:
+            if base is Observable:
+                break
+            setattr_ = base.__dict__.get("__setattr__")
+            if setattr_ is not None and setattr_ is not _tracking_setattr:
+                return Observable
+        return cls
+
+    def _record_change(self, name: str, old: T.Any, new: T.Any) -> None:
+        changes = self.__dict__.get("_changes")
+        if changes is None:
+            changes = {}
+            object.__setattr__(self, "_changes", changes)
+
+        if not changes:
+            change_notifier.mark_dirty(self)
+
+        if name in changes:
+            changes[name] = (changes[name][0], new)
+        else:
+            changes[name] = (old, new)
+
+    def _take_changes(self) -> Changes:
+        changes = self.__dict__.get("_changes")
+        if not changes:
+            return {}
+
+        object.__setattr__(self, "_changes", {})
+        return {name: (old, new) for name, (old, new) in changes.items()
+                if not _is_same(old, new)}
+
+    def _get_observers(self) -> T.Tuple[T.Tuple[Observer, T.Optional[T.FrozenSet[str]]], ...]:
+        return self.__dict__.get("_observers", ())
+
+    def observe(self, callback: Observer, fields: T.Iterable[str] = None) -> Observer:
+        """Calls callback(obj, changes) once per frame in which observed
+        fields of this object changed, fields limits it to given names."""
+
+        observers = self.__dict__.get("_observers", ())
+        if not observers:
+            _start_tracking(self._get_tracked_class())
+
+        fields = None if fields is None else frozenset(fields)
+        object.__setattr__(self, "_observers", observers + ((callback, fields),))
+        return callback
+
+    def unobserve(self, callback: Observer) -> None:
+        observers = self.__dict__.get("_observers", ())
+        remaining = tuple(item for item in observers if item[0] != callback)
+        object.__setattr__(self, "_observers", remaining)
+
+        if observers and not remaining:
+            _stop_tracking(self._get_tracked_class())
@@ -3,7 +3,7 @@
 """
 
 import typing as T
-from collections import defaultdict
+import traceback
 
 
 class HandlerNotFound(Exception):
@@ -29,41 +29,128 @@ class EventNotFound(Exception):
         return "Event {} wasn't found".format(self.event)
 
 
+EventKey = T.Union[str, int]
+
+
 class EventManager:
-    """Event system for python"""
+    """Event system for python
+
+    Event names are interned into integer ids, get_event_id, and handlers
+    are kept in a table indexed by id. Every method accepts either a name
+    or an id, hot paths (picking, gizmos) look their ids up once and then
+    trigger by id, without building or hashing name strings.
+
+    Handlers of an event are kept in a tuple which is replaced, never
+    modified, when handlers are registered or removed, so trigger can
+    iterate it without copying even if handlers register or remove others.
+
+    Events can also be posted to a queue, which is dispatched by flush,
+    once each frame from Engine.update. Posting with a key coalesces
+    events, only the last one posted with a given key is dispatched, e.g.
+    one mouse-over per node per frame. If deferred is set, trigger posts
+    too.
+
+    If tracer is set, an EventTracer, dispatched events are counted and
+    their handlers timed.
+
+    If forward is set, a callable(name, args, kw), every event is passed to
+    it when dispatched, by trigger or flush, whether or not it has handlers
+    here, e.g. isolated play sends events of game scripts to the editor."""
+
+    trace_source = "python"  # source of events in tracer's stats
 
     def __init__(self) -> None:
-        self._events = defaultdict(list)  # type: T.DefaultDict[str, T.List[T.Callable]]
+        self._ids = {}       # type: T.Dict[str, int]
+        self._names = []     # type: T.List[str]
+        self._handlers = []  # type: T.List[T.Tuple[T.Callable, ...]]
+
+        self.deferred = False
+        self.tracer = None
+        self.forward = None
+        self._queue = []   # type: T.List[T.Optional[T.Tuple[int, tuple, dict]]]
+        self._keys = {}    # type: T.Dict[T.Hashable, int]
+
+        # bumped whenever an event gets its first handler, callers caching
+        # that an event has no handlers look up again once it changed
+        self.generation = 0
+
+    def get_event_id(self, event: EventKey) -> int:
+        """Returns integer id of an event name, assigned on first use,
+        ids stay valid for the lifetime of the event manager.
+        Raises EventNotFound for an id that was never assigned."""
+
+        if type(event) is int:
+            if not 0 <= event < len(self._handlers):
+                raise EventNotFound(event)
+            return event
+
+        event_id = self._ids.get(event)
+        if event_id is None:
+            event_id = len(self._names)
+            self._ids[event] = event_id
+            self._names.append(event)
+            self._handlers.append(())
+        return event_id
+
+    def get_event_name(self, event_id: int) -> str:
+        return self._names[event_id]
+
+    def find_event_id(self, event: EventKey) -> T.Optional[int]:
+        """Returns id of event without interning it, None if unknown or
+        not a valid id."""
+
+        if type(event) is int:
+            return event if 0 <= event < len(self._handlers) else None
+        return self._ids.get(event)
+
+    def _dispatch_id(self, event: EventKey) -> T.Optional[int]:
+        """Returns id of an event to be dispatched, None if it has no
+        handlers, events are only interned if they are forwarded."""
+
+        if self.forward is not None:
+            return self.find_event_id(event) if type(event) is int else \
+                self.get_event_id(event)
+
+        event_id = self.find_event_id(event)
+        if event_id is None or not self._handlers[event_id]:
+            return None
+        return event_id
 
     def get_all_handlers(self) -> T.Dict[str, T.List[T.Callable]]:
         """Returns a dict with event names as keys and lists of
         registered handlers as values."""
 
         events = {}
-        for event, handlers in self._events.items():
-            events[event] = list(handlers)
+        for event_id, handlers in enumerate(self._handlers):
+            if handlers:
+                events[self._names[event_id]] = list(handlers)
         return events
 
-    def get_handlers(self, event: str) -> T.List[T.Callable]:
+    def get_handlers(self, event: EventKey) -> T.List[T.Callable]:
         """Returns a list of handlers registered for the given event."""
 
-        return list(self._events.get(event, []))
+        event_id = self.find_event_id(event)
+        return [] if event_id is None else list(self._handlers[event_id])
 
-    def is_registered(self, event: str, handler: T.Callable) -> bool:
+    def is_registered(self, event: EventKey, handler: T.Callable) -> bool:
         """Returns whether the given handler is registered for the
         given event."""
 
-        return handler in self._events.get(event, [])
+        event_id = self.find_event_id(event)
+        return event_id is not None and handler in self._handlers[event_id]
 
     def register(  # pylint: disable=invalid-name
-            self, event: str, *handlers: T.Callable
+            self, event: EventKey, *handlers: T.Callable
     ) -> T.Callable:
         """Registers one or more handlers to a specified event.
         This method may as well be used as a decorator for the handler."""
 
         def _on_wrapper(*handlers_: T.Callable) -> T.Callable:
             """wrapper for on decorator"""
-            self._events[event].extend(handlers_)
+            event_id = self.get_event_id(event)
+            if not self._handlers[event_id]:
+                self.generation += 1
+            self._handlers[event_id] = self._handlers[event_id] + handlers_
             return handlers_[0]
 
         if handlers:
@@ -71,32 +158,33 @@ class EventManager:
         return _on_wrapper
 
     def remove(  # pylint: disable=keyword-arg-before-vararg
-            self, event: str = None, *handlers: T.Callable
+            self, event: EventKey = None, *handlers: T.Callable
     ) -> None:
         """Unregisters a whole event (if no handlers are given) or one
         or more handlers from an event.
         Raises EventNotFound when the given event isn't registered.
         Raises HandlerNotFound when a given handler isn't registered."""
 
-        if not event:
-            self._events.clear()
+        if event is None or event == "":
+            self._handlers[:] = [()] * len(self._handlers)
             return
 
-        if event not in self._events:
+        event_id = self.find_event_id(event)
+        if event_id is None or not self._handlers[event_id]:
             raise EventNotFound(event)
 
         if not handlers:
-            self._events.pop(event)
+            self._handlers[event_id] = ()
             return
 
         for callback in handlers:
-            if callback not in self._events[event]:
+            if callback not in self._handlers[event_id]:
                 raise HandlerNotFound(event, callback)
-            while callback in self._events[event]:
-                self._events[event].remove(callback)
+            self._handlers[event_id] = tuple(
+                handler for handler in self._handlers[event_id] if handler != callback)
         return
 
-    def trigger_once(self, event: str, *handlers: T.Callable) -> T.Callable:
+    def trigger_once(self, event: EventKey, *handlers: T.Callable) -> T.Callable:
         """Registers one or more handlers to a specified event, but
         removes them when the event is first triggered.
         This method may as well be used as a decorator for the handler."""
@@ -108,24 +196,135 @@ class EventManager:
                 """Wrapper that unregisters itself before executing
                 the handlers"""
 
-                self.off(event, _wrapper)
+                self.remove(event, _wrapper)
                 for handler in handlers_:
                     handler(*args, **kw)
 
             return _wrapper
 
         if handlers:
-            return self.on(event, _once_wrapper(*handlers))
-        return lambda x: self.on(event, _once_wrapper(x))
+            return self.register(event, _once_wrapper(*handlers))
+        return lambda x: self.register(event, _once_wrapper(x))
 
-    def trigger(self, event: str, *args: T.Any, **kw: T.Any) -> bool:
+    def trigger(self, event: EventKey, *args: T.Any, **kw: T.Any) -> bool:
         """Triggers all handlers which are subscribed to an event.
-        Returns True when there were callbacks to execute, False otherwise."""
+        Returns True when there were callbacks to execute, False otherwise.
+        In deferred mode, the event is posted instead and dispatched on next
+        flush."""
+
+        if type(event) is int:
+            event_id = event if 0 <= event < len(self._handlers) else None
+        elif self.forward is None:
+            event_id = self._ids.get(event)
+        else:
+            event_id = self.get_event_id(event)
+        if event_id is None:
+            return False
 
-        callbacks = list(self._events.get(event, []))
-        if not callbacks:
+        callbacks = self._handlers[event_id]
+        if not callbacks and self.forward is None:
             return False
 
+        if self.deferred:
+            self._queue.append((event_id, args, kw))
+            return bool(callbacks)
+
+        if self.forward is not None:
+            self.forward(self._names[event_id], args, kw)
+            if not callbacks:
+                return False
+
+        if self.tracer is not None:
+            self._dispatch_traced(event_id, callbacks, args, kw)
+            return True
+
         for callback in callbacks:
             callback(*args, **kw)
         return True
+
+    def _dispatch_traced(self, event_id: int, callbacks: T.Tuple[T.Callable, ...],
+                         args: tuple, kw: dict) -> None:
+        name = self._names[event_id]
+        self.tracer.count(self.trace_source, name)
+        for callback in callbacks:
+            self.tracer.call(self.trace_source, name, callback, *args, **kw)
+
+    def post(self, event: EventKey, *args: T.Any, **kw: T.Any) -> None:
+        """Queues an event, it is dispatched on next flush. Like trigger,
+        events without handlers are dropped."""
+
+        event_id = self._dispatch_id(event)
+        if event_id is not None:
+            self._queue.append((event_id, args, kw))
+
+    def post_coalesced(self, key: T.Hashable, event: EventKey, *args: T.Any,
+                       **kw: T.Any) -> None:
+        """Queues an event, replacing any event queued with the same key
+        since last flush, the event takes the replaced one's place at the
+        end of the queue."""
+
+        event_id = self._dispatch_id(event)
+        if event_id is None:
+            return
+
+        index = self._keys.get(key)
+        if index is not None:
+            self._queue[index] = None
+
+        self._keys[key] = len(self._queue)
+        self._queue.append((event_id, args, kw))
+
+    def flush(self) -> int:
+        """Dispatches queued events in order they were posted, events
+        posted by handlers are dispatched on next flush.
+        Returns number of events dispatched."""
+
+        if not self._queue:
+            return 0
+
+        queue = self._queue
+        self._queue = []
+        self._keys = {}
+
+        handlers = self._handlers
+        dispatched = 0
+        for item in queue:
+            if item is None:
+                continue
+
+            event_id, args, kw = item
+            if self.forward is not None:
+                try:
+                    self.forward(self._names[event_id], args, kw)
+                except Exception:
+                    traceback.print_exc()
+
+            callbacks = handlers[event_id]
+            if not callbacks:
+                continue
+
+            dispatched += 1
+            if self.tracer is not None:
+                self.tracer.count(self.trace_source, self._names[event_id])
+
+            for callback in callbacks:
+                try:
+                    if self.tracer is not None:
+                        self.tracer.call(self.trace_source, self._names[event_id], callback,
+                                         *args, **kw)
+                    else:
+                        callback(*args, **kw)
+                except Exception:
+                    traceback.print_exc()
+
+        return dispatched
+
+    def clear_queue(self) -> None:
+        """Drops all queued events."""
+
+        self._queue = []
+        self._keys = {}
+
+    @property
+    def num_queued(self) -> int:
+        return len(self._queue) - sum(1 for item in self._queue if item is None)
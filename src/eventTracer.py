@@ -0,0 +1,201 @@
+import os
+import csv
+import json
+import time
+import weakref
+
+
+# where an event was dispatched from
+SOURCE_PANDA = "panda"    # Demon.on_any_event, events sent by panda's messenger
+SOURCE_PYTHON = "python"  # EventManager, events triggered by editor and scripts
+
+# columns of saved csv files
+EVENT_FIELDS = ("source", "event", "count", "frames", "max_per_frame", "per_frame")
+HANDLER_FIELDS = ("source", "event", "handler", "calls", "total_ms", "mean_ms", "max_ms")
+
+
+class EventTracer(object):
+    """Counts events per name per frame and times every handler they are
+    dispatched to, for events of both Demon.on_any_event and the python
+    EventManager.
+
+    Stats are kept in memory, get_event_stats and get_handler_stats return
+    them as rows, save writes them as csv or json. When disabled, dispatch
+    costs a single check per event."""
+
+    def __init__(self, demon, trace_path="event_trace.csv"):
+        object.__init__(self)
+
+        self.__demon = demon
+        self.__enabled = False
+        self.trace_path = trace_path
+
+        self.__frame_counts = {}  # (source, event): count in current frame
+        self.__events = {}        # (source, event): [count, frames, max per frame]
+        self.__handlers = {}      # (source, event, handler): [calls, total, max]
+        # function: name, cache, weak so removed gizmos and reloaded
+        # scripts are not kept alive by it
+        self.__handler_names = weakref.WeakKeyDictionary()
+        self.__frames = 0
+
+    def enable(self):
+        if self.__enabled:
+            return
+
+        self.__enabled = True
+        self.__demon.event_manager.tracer = self
+
+    def disable(self):
+        if not self.__enabled:
+            return
+
+        self.end_frame()
+        self.__enabled = False
+        self.__demon.event_manager.tracer = None
+
+    def toggle(self):
+        self.disable() if self.__enabled else self.enable()
+        print("-- Event tracer {0}".format("on" if self.__enabled else "off"))
+
+    def clear(self):
+        self.__frame_counts = {}
+        self.__events = {}
+        self.__handlers = {}
+        self.__frames = 0
+
+    def update(self):
+        """Called once each frame by Demon, after events queued during the
+        frame are flushed, closes per frame counts of the frame."""
+        self.end_frame()
+        self.__frames += 1
+
+    def end_frame(self):
+        for key, count in self.__frame_counts.items():
+            stats = self.__events.get(key)
+            if stats is None:
+                self.__events[key] = [count, 1, count]
+            else:
+                stats[0] += count
+                stats[1] += 1
+                if count > stats[2]:
+                    stats[2] = count
+
+        self.__frame_counts = {}
+
+    def count(self, source, event):
+        key = (source, event)
+        self.__frame_counts[key] = self.__frame_counts.get(key, 0) + 1
+
+    def call(self, source, event, handler, *args, **kwargs):
+        """Calls handler, timing it, returns its result."""
+        start = time.perf_counter()
+        try:
+            return handler(*args, **kwargs)
+        finally:
+            self.record(source, event, handler, time.perf_counter() - start)
+
+    def record(self, source, event, handler, seconds):
+        key = (source, event, self.get_handler_name(handler))
+        stats = self.__handlers.get(key)
+        if stats is None:
+            self.__handlers[key] = [1, seconds, seconds]
+        else:
+            stats[0] += 1
+            stats[1] += seconds
+            if seconds > stats[2]:
+                stats[2] = seconds
+
+    def get_handler_name(self, handler):
+        # bound methods are made anew on every access, names are cached
+        # by their function
+        func = getattr(handler, "__func__", handler)
+        try:
+            name = self.__handler_names.get(func)
+        except TypeError:
+            name = None
+            cache = False
+        else:
+            cache = True
+
+        if name is None:
+            name = "{0}.{1}".format(getattr(func, "__module__", None) or "?",
+                                    getattr(func, "__qualname__", None) or repr(func))
+            if cache:
+                self.__handler_names[func] = name
+
+        return name
+
+    def get_event_stats(self):
+        """Returns a list of dicts, one per event, sorted by count."""
+        rows = []
+        for (source, event), (count, frames, max_count) in self.__events.items():
+            rows.append({"source": source,
+                         "event": event,
+                         "count": count,
+                         "frames": frames,
+                         "max_per_frame": max_count,
+                         "per_frame": count / max(self.__frames, 1)})
+
+        rows.sort(key=lambda row: -row["count"])
+        return rows
+
+    def get_handler_stats(self, event=None):
+        """Returns a list of dicts, one per event and handler, sorted by
+        total time, times are in milliseconds."""
+        rows = []
+        for (source, event_, handler), (calls, total, max_time) in self.__handlers.items():
+            if event is not None and event_ != event:
+                continue
+
+            rows.append({"source": source,
+                         "event": event_,
+                         "handler": handler,
+                         "calls": calls,
+                         "total_ms": total * 1000,
+                         "mean_ms": total * 1000 / calls,
+                         "max_ms": max_time * 1000})
+
+        rows.sort(key=lambda row: -row["total_ms"])
+        return rows
+
+    def save(self, path=None):
+        """Saves stats as json if path ends with .json, otherwise handler
+        stats as csv, event counts are saved next to it."""
+        path = path or self.trace_path
+        self.end_frame()
+
+        if path.endswith(".json"):
+            with open(path, "w") as file:
+                json.dump({"frames": self.__frames,
+                           "events": self.get_event_stats(),
+                           "handlers": self.get_handler_stats()}, file, indent=1)
+        else:
+            self.__save_csv(path, HANDLER_FIELDS, self.get_handler_stats())
+            root, ext = os.path.splitext(path)
+            self.__save_csv("{0}_events{1}".format(root, ext or ".csv"), EVENT_FIELDS,
+                            self.get_event_stats())
+
+        print("-- Event trace of {0} frames saved to {1}".format(self.__frames, path))
+        return path
+
+    @staticmethod
+    def __save_csv(path, fields, rows):
+        # header is written even if there are no rows
+        with open(path, "w", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(rows)
+
+    def print_top(self, num=10):
+        print("-- Slowest event handlers, {0} frames".format(self.__frames))
+        for row in self.get_handler_stats()[:num]:
+            print("   {total_ms:>9.2f} ms total {max_ms:>8.2f} ms max {calls:>7} calls  "
+                  "{event} -> {handler}".format(**row))
+
+    @property
+    def enabled(self):
+        return self.__enabled
+
+    @property
+    def frames(self):
+        return self.__frames
@@ -0,0 +1,92 @@
+class FixedStepScheduler(object):
+    """Runs fixed update callbacks at a fixed simulation rate, independent of
+    the render frame rate.
+
+    Elapsed frame time is added to an accumulator, which is consumed in
+    steps of fixed size, at most max_steps steps are run in a frame so a heavy
+    frame does not cause a spiral of ever more catch up steps, any time left
+    over after that is dropped. The remainder of the accumulator as a fraction
+    of step size (alpha) can be used to interpolate rendered state between
+    last two simulation steps."""
+
+    def __init__(self, step=1 / 60, max_steps=5):
+        object.__init__(self)
+
+        self.step = step
+        self.max_steps = max_steps
+
+        self.__callbacks = []  # (sort, callback), kept sorted by sort value
+        self.__accumulator = 0
+        self.__alpha = 0
+
+        self.__steps = 0          # steps run in last frame
+        self.__total_steps = 0
+        self.__dropped_time = 0   # time dropped due to max_steps
+
+    def add(self, callback, sort=0):
+        """Adds a callback to be called with step size each fixed step,
+        callbacks with lower sort values are called first."""
+        if callback in self:
+            return
+
+        self.__callbacks.append((sort, callback))
+        self.__callbacks.sort(key=lambda item: item[0])
+
+    def remove(self, callback):
+        self.__callbacks = [item for item in self.__callbacks if item[1] != callback]
+
+    def __contains__(self, callback):
+        for _, callback_ in self.__callbacks:
+            if callback_ == callback:
+                return True
+        return False
+
+    def reset(self):
+        self.__accumulator = 0
+        self.__alpha = 0
+
+    def update(self, dt):
+        """Advances the simulation by dt seconds of frame time, running as
+        many fixed steps as due."""
+
+        if not self.__callbacks:
+            self.__steps = 0
+            self.__accumulator = 0
+            return
+
+        self.__accumulator += dt
+        steps = 0
+
+        while self.__accumulator >= self.step and steps < self.max_steps:
+            for _, callback in tuple(self.__callbacks):
+                callback(self.step)
+
+            self.__accumulator -= self.step
+            steps += 1
+
+        if self.__accumulator >= self.step:
+            dropped = self.__accumulator - self.__accumulator % self.step
+            self.__dropped_time += dropped
+            self.__accumulator -= dropped
+
+        self.__steps = steps
+        self.__total_steps += steps
+        self.__alpha = self.__accumulator / self.step
+
+    @property
+    def alpha(self):
+        """Fraction of a step simulation time is behind real time, in range
+        [0, 1), use this to interpolate between last two steps."""
+        return self.__alpha
+
+    @property
+    def steps(self):
+        return self.__steps
+
+    @property
+    def total_steps(self):
+        return self.__total_steps
+
+    @property
+    def dropped_time(self):
+        return self.__dropped_time
@@ -0,0 +1,139 @@
+import time
+from panda3d.core import GraphicsWindow
+
+
+class FramePacer(object):
+    """Keeps the main loop at a target frame rate, instead of spinning as fast
+    as possible, the remaining time of each frame (slack) is spent sleeping,
+    followed by a short busy wait to hit the deadline precisely.
+
+    A lower rate is used when the window is minimized or not focused, and
+    when no input events have been received for idle_timeout seconds."""
+
+    def __init__(self, win, target_fps=60, background_fps=10, idle_fps=30,
+                 idle_timeout=2.0, spin_time=0.002):
+        object.__init__(self)
+
+        self.__win = win
+        self.__has_props = isinstance(win, GraphicsWindow)
+
+        self.target_fps = target_fps          # None or 0 disables pacing
+        self.background_fps = background_fps  # minimized or unfocused window
+        self.idle_fps = idle_fps              # no input since idle_timeout
+        self.idle_timeout = idle_timeout
+
+        # sleeping is only accurate to a millisecond or two, the last
+        # spin_time seconds before a deadline are busy waited.
+        self.spin_time = spin_time
+
+        self.__deadline = None
+        self.__frame_start = time.perf_counter()
+        self.__last_activity = self.__frame_start
+
+        # per frame slack accounting
+        self.__work_time = 0     # time spent in last frame's update
+        self.__slack = 0         # time left till deadline after last update,
+                                 # negative if the frame overran
+        self.__total_slack = 0
+        self.__overruns = 0
+        self.__frames = 0
+
+    def notify_activity(self):
+        """Should be called when user input is received, resets the idle timer."""
+        self.__last_activity = time.perf_counter()
+
+    def get_current_fps(self):
+        """Returns the frame rate pacer is currently aiming for, None if
+        pacing is disabled."""
+        if not self.target_fps:
+            return None
+
+        if self.__has_props:
+            props = self.__win.getProperties()
+            if props.getMinimized() or not props.getForeground():
+                return min(self.background_fps, self.target_fps)
+
+        if time.perf_counter() - self.__last_activity > self.idle_timeout:
+            return min(self.idle_fps, self.target_fps)
+
+        return self.target_fps
+
+    def time_left(self):
+        """Returns seconds left till current frame's deadline, None if pacing
+        is disabled."""
+        fps = self.get_current_fps()
+        if not fps:
+            return None
+
+        deadline = self.__deadline
+        if deadline is None:
+            deadline = self.__frame_start + 1.0 / fps
+
+        return deadline - time.perf_counter()
+
+    def wait(self):
+        """Should be called at end of each frame, blocks until it is time
+        to start the next one."""
+
+        now = time.perf_counter()
+        self.__work_time = now - self.__frame_start
+        self.__frames += 1
+
+        fps = self.get_current_fps()
+        if not fps:
+            self.__slack = 0
+            self.__deadline = None
+            self.__frame_start = now
+            return
+
+        frame_time = 1.0 / fps
+
+        if self.__deadline is None:
+            self.__deadline = self.__frame_start + frame_time
+
+        self.__slack = self.__deadline - now
+        self.__total_slack += self.__slack
+
+        if self.__slack < 0:
+            self.__overruns += 1
+
+            # fell behind by more than a frame, don't try to catch up,
+            # that would only cause a burst of unpaced frames.
+            if -self.__slack > frame_time:
+                self.__deadline = now
+        else:
+            # sleep for most of the slack, then spin for the rest
+            sleep_time = self.__slack - self.spin_time
+            if sleep_time > 0:
+                time.sleep(sleep_time)
+
+            while time.perf_counter() < self.__deadline:
+                pass
+
+        self.__frame_start = time.perf_counter()
+        self.__deadline += frame_time
+
+    def reset_stats(self):
+        self.__total_slack = 0
+        self.__overruns = 0
+        self.__frames = 0
+
+    @property
+    def work_time(self):
+        return self.__work_time
+
+    @property
+    def slack(self):
+        return self.__slack
+
+    @property
+    def average_slack(self):
+        return self.__total_slack / self.__frames if self.__frames else 0
+
+    @property
+    def overruns(self):
+        return self.__overruns
+
+    @property
+    def frames(self):
+        return self.__frames
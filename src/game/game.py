@@ -3,6 +3,10 @@ from os import path as ospath
 from game.scene import Scene
 
 
+# window area game preview is shown in, left, right, bottom, top
+PREVIEW_REGION = (0, 0.4, 0, 0.35)
+
+
 class Game:
     """Game is entry point to what will go into your final build"""
  
@@ -16,14 +20,31 @@ class Game:
         self.__dr = None
         self.__dr2d = None  
 
+        # game is rendered into an offscreen buffer and shown in the window
+        # on a card, so the preview keeps its last image on frames it is
+        # not updated, see RegionScheduler.
+        self.__preview_buffer = None
+        self.__preview_dr = None      # window display region showing the card
+        self.__preview_card = None
+        self.__preview_card_root = None
+
+        self.preview_fps = None        # None updates preview every frame
+        self.preview_unfocused_fps = 4  # rate while mouse is not over preview
+
         self.__mouse_watcher = None
 
         self.__runtime_scripts = {}  # loaded runtime scripts
         self.__components = {}       # path: component
         self.__attached_comps = {}   # comp: list component instances
+        self.__attach_job = None     # work queue job of attach_components
 
         self.__scenes = []           # all scenes in this game
         self.__active_scene = None
+        self.__is_running = False
+
+        # if True game runs in a child process, see PlayProcess
+        self.isolated_play = False
+        self.__play_process = None
 
     def init(self):        
         # ------------------------------------
@@ -37,11 +58,18 @@ class Game:
         self.__render2d.setTwoSided(1)
         
         # display region
+        self.create_preview_buffer()
         self.create_dr3d()
         self.create_dr2d()
+        self.create_preview_dr()
         
         self.create_mouse_watcher_3d()
-        self.__mouse_watcher.node().setDisplayRegion(self.__dr2d)
+        self.__mouse_watcher.node().setDisplayRegion(self.__preview_dr)
+
+        self.__demon.engine.region_scheduler.add(self.__preview_buffer,
+                                                 fps=self.preview_fps,
+                                                 unfocused_fps=self.preview_unfocused_fps,
+                                                 focus_check=self.is_preview_focused)
         
         # -----------------------------------------------------------
         # finally, start the game update task
@@ -53,20 +81,78 @@ class Game:
         
     def on_update(self, task):
         self.__active_scene.update()
-        return task.cont
+        return task.DS_cont
         
+    def create_preview_buffer(self):
+        x_size, y_size = self.get_preview_size()
+        self.__preview_buffer = self.__demon.engine.win.makeTextureBuffer("GamePreview",
+                                                                          x_size, y_size)
+
     def create_dr2d(self):
-        self.__dr2d = self.__demon.engine.win.makeDisplayRegion(0, 0.4, 0, 0.35)
+        self.__dr2d = self.__preview_buffer.makeDisplayRegion()
         self.__dr2d.setClearDepthActive(False)
         self.__dr2d.setSort(20)
         self.__dr2d.setActive(True)
 
     def create_dr3d(self):
-        self.__dr = self.__demon.engine.win.makeDisplayRegion(0, 0.4, 0, 0.35)
+        self.__dr = self.__preview_buffer.makeDisplayRegion()
         self.__dr.setSort(10)
         self.__dr.setClearColorActive(True)
         self.__dr.setClearDepthActive(True)
         self.__dr.setClearColor((0.65, 0.65, 0.65, 1.0))
+
+    def create_preview_dr(self):
+        """creates the window display region game preview is shown in"""
+
+        self.__preview_card_root = p3d.NodePath("GamePreviewCardRoot")
+        self.__preview_card_root.setDepthTest(0)
+        self.__preview_card_root.setDepthWrite(0)
+
+        cam = p3d.NodePath(p3d.Camera("GamePreviewCardCam"))
+        cam.reparentTo(self.__preview_card_root)
+
+        lens = p3d.OrthographicLens()
+        lens.setFilmSize(2, 2)
+        lens.setNearFar(-1000, 1000)
+        cam.node().setLens(lens)
+
+        self.__preview_dr = self.__demon.engine.win.makeDisplayRegion(*PREVIEW_REGION)
+        self.__preview_dr.setSort(10)
+        self.__preview_dr.setCamera(cam)
+
+        self.create_preview_card()
+
+    def create_preview_card(self):
+        if self.__preview_card:
+            self.__preview_card.removeNode()
+
+        texture = self.__preview_buffer.getTexture()
+
+        # texture may be padded to a power of two size
+        cm = p3d.CardMaker("GamePreviewCard")
+        cm.setFrameFullscreenQuad()
+        cm.setUvRange(texture)
+
+        self.__preview_card = self.__preview_card_root.attachNewNode(cm.generate())
+        self.__preview_card.setTexture(texture)
+
+    def get_preview_size(self):
+        """returns size in pixels of game preview"""
+        win = self.__demon.engine.win
+        left, right, bottom, top = PREVIEW_REGION
+        return (max(1, int(win.getXSize() * (right - left))),
+                max(1, int(win.getYSize() * (top - bottom))))
+
+    def is_preview_focused(self):
+        return self.__mouse_watcher.node().hasMouse()
+
+    def set_preview_rate(self, fps=None, unfocused_fps=None):
+        """sets rate game preview is updated at while mouse is over it and
+        while it is not, None updates it every frame"""
+        self.preview_fps = fps
+        self.preview_unfocused_fps = unfocused_fps
+        self.__demon.engine.region_scheduler.set_rate(self.__preview_buffer,
+                                                      fps, unfocused_fps)
         
     def create_mouse_watcher_3d(self):
         mk = self.__demon.engine.mw.getParent()
@@ -125,6 +211,27 @@ class Game:
         instance = comp(comp_path, comp_name, np)
         self.__attached_comps[np].append(instance)
         
+    def attach_components(self, items, chunk=100):
+        """attaches components to nodes a part each frame, items are
+        (nodepath, component path) pairs, returns the work queue job"""
+        items = list(items)
+
+        def job():
+            for i, (np, comp_path) in enumerate(items):
+                self.attach_component(np, comp_path)
+                if i % chunk == chunk - 1:
+                    yield (i + 1) / len(items)
+
+        self.__attach_job = self.__demon.engine.work_queue.submit(job(), "Attach components")
+        return self.__attach_job
+
+    def finish_attaching(self):
+        """runs job of attach_components, if any, to completion"""
+        job = self.__attach_job
+        self.__attach_job = None
+        while job is not None and job.step():
+            pass
+
     def set_runtime_scripts(self, scripts):
         self.__runtime_scripts.clear()
         self.__runtime_scripts = {**scripts}
@@ -133,7 +240,23 @@ class Game:
         self.__components.clear()
         self.__components = {**comps}
 
+        # components already attached to nodes are instances of classes
+        # before reload, they are attached again, from new classes, as a
+        # work queue job, since there may be thousands of them
+        self.finish_attaching()
+        if self.__attached_comps and not self.is_running():
+            items = [(np, comp.path()) for np, instances in self.__attached_comps.items()
+                     for comp in instances if comp.path() in self.__components]
+            self.__attached_comps.clear()
+            self.attach_components(items)
+
     def start(self):
+        self.finish_attaching()
+
+        if self.isolated_play:
+            self.start_isolated()
+            return
+
         __all_modules = {**self.__runtime_scripts, **self.__attached_comps}
         
         # classify all scripts according to their respective task sort values
@@ -155,6 +278,10 @@ class Game:
                 scripts_exec_order[item.sort()].append(item)
 
         # finally start
+        success = True
+        self.__is_running = True
+        self.__demon.engine.fixed_scheduler.reset()
+
         for scripts in scripts_exec_order.values():
             for script in scripts: 
                 try:
@@ -167,7 +294,20 @@ class Game:
         if not success:
             self.stop()
 
+    def start_isolated(self):
+        """starts game in a child process, editor mirrors the running game"""
+        if self.__play_process is None:
+            from game.playProcess import PlayProcess
+            self.__play_process = PlayProcess(self.__demon)
+
+        self.__play_process.start()
+
     def stop(self):
+        if self.__play_process:
+            self.__play_process.stop()
+
+        self.__is_running = False
+
         for value in self.__runtime_scripts.values():
             if value.is_running():
                 value.stop()
@@ -177,8 +317,31 @@ class Game:
                 if item.is_running():
                     item.stop()
 
+    def is_running(self):
+        return self.__is_running or \
+            (self.__play_process is not None and self.__play_process.is_running())
+
+    def shutdown(self):
+        """should be called when editor exits, stops game and waits for game
+        process to exit"""
+        self.stop()
+        if self.__play_process:
+            self.__play_process.close()
+
+    def get_attached_components(self):
+        """returns a dict of nodepath: list of components attached to it"""
+        return {np: list(comps) for np, comps in self.__attached_comps.items()}
+
     def on_resize_event(self):
         """should be called after a window has been resized"""
+        x_size, y_size = self.get_preview_size()
+        buffer = self.__preview_buffer
+
+        if buffer.getXSize() != x_size or buffer.getYSize() != y_size:
+            buffer.setSize(x_size, y_size)
+            self.create_preview_card()
+            self.__demon.engine.region_scheduler.mark_dirty(buffer)
+
         self.__active_scene.on_resize_event()
         
     listen = lambda self, evt, callback, *args: self.__demon.accept(evt,
@@ -197,6 +360,14 @@ class Game:
     def dr2d(self):
         return self.__dr2d
     
+    @property
+    def preview_buffer(self):
+        return self.__preview_buffer
+
+    @property
+    def preview_dr(self):
+        return self.__preview_dr
+
     @property
     def mouse_watcher(self):
         return self.__mouse_watcher
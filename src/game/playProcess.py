@@ -0,0 +1,341 @@
+import os
+import sys
+import json
+import time
+import struct
+import subprocess
+import panda3d.core as p3d
+
+from utils.sharedRingBuffer import SharedRingBuffer
+
+
+# transforms message, frame number and number of entries, followed by
+# entries of node index, position, rotation as quaternion and scale
+_FRAME = struct.Struct("<iI")
+_ENTRY = struct.Struct("<i10f")
+
+
+def get_scene_nodes(root):
+    """Returns root and all its descendants in depth first order, this order
+    survives a bam round trip, so a node is identified by its index in both
+    editor and game process."""
+    return [root] + list(root.findAllMatches("**"))
+
+
+class PlayProcess(object):
+    """Runs the game in a child process, so slow or crashing game scripts
+    can not freeze or take down the editor.
+
+    The active scene is sent to the child as a bam stream, along with the
+    components attached to its nodes, the child then starts the game and
+    each frame streams back transforms of nodes that changed and events
+    triggered on its event manager, through shared memory ring buffers.
+    The editor applies them to its own copy of the scene, mirroring the
+    running game, transforms are restored when the game is stopped.
+
+    Nodes created or removed by game scripts are not mirrored."""
+
+    def __init__(self, demon, transforms_size=4 << 20, events_size=256 << 10,
+                 stop_timeout=2.0):
+        object.__init__(self)
+
+        self.__demon = demon
+        self.__transforms_size = transforms_size
+        self.__events_size = events_size
+        self.stop_timeout = stop_timeout
+
+        self.__process = None
+        self.__nodes = []
+        self.__saved_transforms = []
+
+        self.__commands = None    # editor to game
+        self.__transforms = None  # game to editor
+        self.__events = None      # game to editor
+
+        self.__stop_time = None   # time stop was requested at
+
+    def start(self, fps=60):
+        if self.__process is not None:
+            return False
+
+        game = self.__demon.game
+        root = game.active_scene.render
+
+        self.__nodes = get_scene_nodes(root)
+        self.__saved_transforms = [np.getTransform() for np in self.__nodes]
+
+        indices = {np: i for i, np in enumerate(self.__nodes)}
+        components = [(indices[np], comp.path())
+                      for np, comps in game.get_attached_components().items()
+                      if np in indices for comp in comps]
+
+        scene = root.encodeToBamStream()
+
+        self.__commands = SharedRingBuffer(max(64 << 10, len(scene) + 1024))
+        self.__transforms = SharedRingBuffer(self.__transforms_size)
+        self.__events = SharedRingBuffer(self.__events_size)
+
+        self.__commands.write(bytes(scene))
+
+        config = {"project": self.__demon.project.path,
+                  "fps": fps,
+                  "editor_pid": os.getpid(),
+                  "components": components,
+                  "commands": self.__commands.name,
+                  "transforms": self.__transforms.name,
+                  "events": self.__events.name}
+
+        # child imports editor modules the same way this process does
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(path for path in sys.path if path)
+
+        self.__process = subprocess.Popen([sys.executable, "-m", "game.playProcess",
+                                           json.dumps(config)], env=env)
+        self.__stop_time = None
+
+        self.__demon.engine.add_update_callback(self.update)
+        print("-- Game process started, pid {0}".format(self.__process.pid))
+        return True
+
+    def stop(self):
+        """Asks game process to stop, it is killed if it has not exited
+        after stop_timeout seconds."""
+        if self.__process is None or self.__stop_time is not None:
+            return
+
+        self.__commands.write(b"stop")
+        self.__stop_time = time.perf_counter()
+        self.restore_transforms()
+
+    def close(self):
+        """Stops game process and waits for it to exit."""
+        if self.__process is None:
+            return
+
+        self.stop()
+        try:
+            self.__process.wait(self.stop_timeout)
+        except subprocess.TimeoutExpired:
+            self.__process.kill()
+            self.__process.wait()
+
+        self.__cleanup()
+
+    def restore_transforms(self):
+        for np, transform in zip(self.__nodes, self.__saved_transforms):
+            if not np.isEmpty():
+                np.setTransform(transform)
+
+    def update(self):
+        """Applies transforms and events received from game process, should be
+        called each frame."""
+        if self.__process is None:
+            return
+
+        if self.__stop_time is None:
+            self.__apply_transforms()
+        self.__dispatch_events()
+
+        exit_code = self.__process.poll()
+
+        if exit_code is not None:
+            if self.__stop_time is None:
+                print("-- Game process exited unexpectedly with code {0}".format(exit_code))
+                self.restore_transforms()
+            self.__cleanup()
+
+        elif self.__stop_time is not None and \
+                time.perf_counter() - self.__stop_time > self.stop_timeout:
+            print("-- Game process did not stop, killing it")
+            self.__process.kill()
+            self.__process.wait()
+            self.__cleanup()
+
+    def __apply_transforms(self):
+        nodes = self.__nodes
+        num_nodes = len(nodes)
+
+        for data in self.__transforms.read_all():
+            frame, count = _FRAME.unpack_from(data, 0)
+
+            for index, px, py, pz, qr, qi, qj, qk, sx, sy, sz in \
+                    _ENTRY.iter_unpack(data[_FRAME.size:_FRAME.size + count * _ENTRY.size]):
+                if index < num_nodes:
+                    nodes[index].setPosQuatScale((px, py, pz),
+                                                 p3d.LQuaternionf(qr, qi, qj, qk),
+                                                 (sx, sy, sz))
+
+    def __dispatch_events(self):
+        event_manager = self.__demon.event_manager
+
+        for data in self.__events.read_all():
+            message = json.loads(data)
+            msg_type = message.get("type")
+
+            if msg_type == "event":
+                event_manager.trigger(message["name"], *message.get("args", []))
+
+            elif msg_type == "stopped":
+                # game stopped itself, e.g. a script raised an exception
+                if self.__stop_time is None:
+                    self.__stop_time = time.perf_counter()
+                    self.restore_transforms()
+
+    def __cleanup(self):
+        self.__demon.engine.remove_update_callback(self.update)
+
+        for ring in (self.__commands, self.__transforms, self.__events):
+            ring.close()
+
+        self.__commands = self.__transforms = self.__events = None
+        self.__process = None
+        self.__stop_time = None
+        self.__nodes = []
+        self.__saved_transforms = []
+
+        print("-- Game process stopped")
+
+    def is_running(self):
+        return self.__process is not None and self.__stop_time is None
+
+    @property
+    def pid(self):
+        return self.__process.pid if self.__process else None
+
+
+class _GameHost(object):
+    """Game process side of PlayProcess, runs the game in a headless demon
+    and publishes changes back to editor."""
+
+    def __init__(self, demon, config):
+        object.__init__(self)
+
+        self.__demon = demon
+        self.__editor_pid = config["editor_pid"]
+        self.__commands = SharedRingBuffer(name=config["commands"])
+        self.__transforms = SharedRingBuffer(name=config["transforms"])
+        self.__events = SharedRingBuffer(name=config["events"])
+
+        # nothing is shown, don't render
+        engine = demon.engine
+        game = demon.game
+        engine.region_scheduler.remove(game.preview_buffer)
+        game.preview_buffer.setActive(False)
+        engine.win.setActive(False)
+
+        # replace default scene contents with the one sent by editor
+        root = game.active_scene.render
+        for child in root.getChildren():
+            child.removeNode()
+
+        scene = p3d.NodePath.decodeFromBamStream(self.__commands.read())
+        root.setTransform(scene.getTransform())
+        for child in scene.getChildren():
+            child.reparentTo(root)
+
+        self.__nodes = get_scene_nodes(root)
+        self.__sent = [np.getTransform() for np in self.__nodes]
+
+        # default scene's camera was removed along with its other contents,
+        # the editor's copy of it came with the scene, a new one is only
+        # made if it didn't, after nodes are indexed, so indices still match
+        camera = root.find("MainCamera")
+        game.active_scene.set_main_camera(None if camera.isEmpty() else camera)
+        self.__buffer = bytearray()
+
+        # forward events triggered or posted by game scripts to editor, as
+        # they are dispatched, event ids are only valid in this process, they
+        # are sent as names
+        def forward(name, args, kw):
+            self.send({"type": "event", "name": name, "args": args})
+
+        demon.event_manager.forward = forward
+
+        demon.on_dir_event()
+        for index, path in config["components"]:
+            game.attach_component(self.__nodes[index], path)
+
+        demon.on_update = self.update
+        game.start()
+        self.send({"type": "started"})
+
+    def send(self, message):
+        try:
+            data = json.dumps(message).encode("utf-8")
+        except TypeError:
+            message["args"] = [repr(arg) for arg in message.get("args", [])]
+            data = json.dumps(message).encode("utf-8")
+
+        self.__events.write(data)
+
+    def update(self):
+        for command in self.__commands.read_all():
+            if command == b"stop":
+                self.__demon.exit()
+
+        # game stopped by itself, or editor is gone
+        if not self.__demon.game.is_running() or os.getppid() != self.__editor_pid:
+            self.__demon.exit()
+            return
+
+        self.publish_transforms()
+
+    def publish_transforms(self):
+        buffer = self.__buffer
+        del buffer[:]
+        buffer.extend(bytes(_FRAME.size))
+
+        changed = []
+        sent = self.__sent
+
+        for index, np in enumerate(self.__nodes):
+            if np.isEmpty():
+                continue
+
+            transform = np.getTransform()
+            if transform == sent[index]:
+                continue
+
+            pos = transform.getPos()
+            quat = transform.getQuat()
+            scale = transform.getScale()
+            buffer.extend(_ENTRY.pack(index, pos[0], pos[1], pos[2],
+                                      quat[0], quat[1], quat[2], quat[3],
+                                      scale[0], scale[1], scale[2]))
+            changed.append((index, transform))
+
+        if not changed:
+            return
+
+        _FRAME.pack_into(buffer, 0, self.__demon.frame_count, len(changed))
+
+        # if editor is not keeping up, changes are sent again next frame
+        if self.__transforms.write(buffer):
+            for index, transform in changed:
+                sent[index] = transform
+
+    def close(self):
+        if self.__demon.game.is_running():
+            self.__demon.game.stop()
+
+        self.send({"type": "stopped"})
+
+        for ring in (self.__commands, self.__transforms, self.__events):
+            ring.close()
+
+
+def main(config):
+    from demon import Demon
+
+    # editor watches the project and reloads scripts, not the game process
+    demon = Demon(config["project"], headless=True, target_fps=config["fps"],
+                  watch_project=False)
+    host = _GameHost(demon, config)
+    try:
+        demon.run()
+    finally:
+        host.close()
+
+
+if __name__ == "__main__":
+    main(json.loads(sys.argv[1]))
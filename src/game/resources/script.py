@@ -13,7 +13,11 @@ class Script(Resource, SingleTask):
         self.__render = Systems.game.active_scene.render
         self.__render2d = Systems.game.active_scene.render2d
         self.__aspect2d = Systems.game.active_scene.aspect2d
-        
+
+    def run_in_executor(self, func, *args):
+        """Runs a blocking function in a worker thread, returns an awaitable."""
+        return Systems.demon.async_loop.run_in_executor(func, *args)
+
     def win(self):
         return self.__win
     
@@ -28,3 +32,8 @@ class Script(Resource, SingleTask):
     
     def aspect2d(self):
         return self.__aspect2d
+
+    def fixed_alpha(self):
+        """Returns how far, as a fraction of fixed step, rendering is ahead of
+        last fixed update, use this to interpolate between fixed steps."""
+        return Systems.demon.engine.fixed_scheduler.alpha
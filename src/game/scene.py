@@ -41,8 +41,8 @@ class Scene:
                 self.orbit_default_sun(dy=1)
         
     def on_resize_event(self):
-        props = self.__game.engine.win.getProperties()
-        aspect = (props.getXSize() * 0.4) / (props.getYSize() * 0.35)
+        win = self.__game.engine.win
+        aspect = (win.getXSize() * 0.4) / (win.getYSize() * 0.35)
         
         if self.__main_cam:
             self.__main_cam.node().getLens().setAspectRatio(aspect)
@@ -57,16 +57,22 @@ class Scene:
         name_ = "%s%s" % (self.__name, "Render")
         self.__render = p3d.NodePath(self.__name)
         self.__render.reparent_to(self.__game.render)
-        
-        # create a new main camera for game world and a lens for it
-        self.__main_cam = p3d.NodePath(p3d.Camera("MainCamera"))
-        self.__main_cam.reparent_to(self.__render)
-
-        lens = p3d.PerspectiveLens()
-        lens.set_fov(60)
-        lens.setAspectRatio(800 / 600)
-        self.__main_cam.node().setLens(lens)
-        
+        self.set_main_camera()
+
+    def set_main_camera(self, camera=None):
+        """Makes camera, a NodePath of a Camera in this scene, the one game
+        world is rendered from, creates a new one if camera is None."""
+        if camera is None:
+            # create a new main camera for game world and a lens for it
+            camera = p3d.NodePath(p3d.Camera("MainCamera"))
+            camera.reparent_to(self.__render)
+
+            lens = p3d.PerspectiveLens()
+            lens.set_fov(60)
+            lens.setAspectRatio(800 / 600)
+            camera.node().setLens(lens)
+
+        self.__main_cam = camera
         self.__game.dr.set_camera(self.__main_cam)
         
     def create_render2d(self):
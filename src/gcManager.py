@@ -0,0 +1,124 @@
+import gc
+import time
+from profiler import CAT_GC
+
+
+class GCManager(object):
+    """Schedules python's cyclic garbage collector around the frame loop.
+
+    Automatic generation 2 collections, the ones that cause long hitches in
+    large scenes, are disabled, instead collections are run from update when
+    the current frame has enough slack left or the editor is idle, and forced
+    when too many are pending. Long lived objects are frozen after project
+    and scene loads so full collections do not have to traverse them.
+
+    Every collection, automatic or scheduled, is counted and timed and also
+    recorded in engine's frame profiler when it is enabled."""
+
+    def __init__(self, profiler=None, gen2_threshold=10, max_pending=100,
+                 max_interval=60.0):
+        object.__init__(self)
+
+        self.__profiler = profiler
+        self.__enabled = False
+        self.__default_threshold = gc.get_threshold()
+
+        self.gen2_threshold = gen2_threshold  # gen1 collections before a gen2 is due
+        self.max_pending = max_pending        # force a gen2 after these many gen1s
+        self.max_interval = max_interval      # force a gen2 after these many seconds
+
+        # stats
+        self.__collections = [0, 0, 0]
+        self.__total_pause = [0.0, 0.0, 0.0]
+        self.__max_pause = [0.0, 0.0, 0.0]
+        self.__last_pause = 0.0
+
+        # moving average of pause time per generation, used to decide
+        # whether a collection fits in time left in a frame
+        self.__estimates = [0.0005, 0.002, 0.02]
+
+        self.__start = 0
+        self.__last_full = time.perf_counter()
+
+    def enable(self):
+        if self.__enabled:
+            return
+
+        threshold = self.__default_threshold
+        gc.set_threshold(threshold[0], threshold[1], 1 << 30)
+        gc.callbacks.append(self.__on_gc)
+        self.__enabled = True
+
+    def disable(self):
+        if not self.__enabled:
+            return
+
+        gc.set_threshold(*self.__default_threshold)
+        gc.callbacks.remove(self.__on_gc)
+        self.__enabled = False
+
+    def freeze(self):
+        """Collects garbage and moves all surviving objects to permanent
+        generation, should be called after loading projects or scenes.
+        Previously frozen objects are unfrozen first, so garbage created by
+        reloads is still collected."""
+
+        gc.unfreeze()
+        gc.collect()
+        gc.freeze()
+
+    def update(self, time_left=None):
+        """Runs a pending collection if it fits in time_left seconds,
+        time_left is None when frame rate is not limited."""
+
+        if not self.__enabled:
+            return
+
+        pending = gc.get_count()[2]
+        if pending < self.gen2_threshold:
+            return
+
+        now = time.perf_counter()
+        overdue = pending >= self.max_pending or \
+            now - self.__last_full >= self.max_interval
+
+        if overdue or (time_left is not None and time_left >= self.__estimates[2]):
+            gc.collect(2)
+
+    def __on_gc(self, phase, info):
+        if phase == "start":
+            self.__start = time.perf_counter()
+            return
+
+        end = time.perf_counter()
+        gen = info["generation"]
+        pause = end - self.__start
+
+        self.__collections[gen] += 1
+        self.__total_pause[gen] += pause
+        self.__max_pause[gen] = max(self.__max_pause[gen], pause)
+        self.__estimates[gen] = self.__estimates[gen] * 0.8 + pause * 0.2
+        self.__last_pause = pause
+
+        if gen == 2:
+            self.__last_full = end
+
+        if self.__profiler and self.__profiler.enabled:
+            self.__profiler.record("GC-Gen{0}".format(gen), CAT_GC, self.__start, end)
+
+    def get_stats(self):
+        """Returns a list of per generation dicts with number of collections
+        and their total and max pause times in seconds."""
+
+        return [{"generation": gen,
+                 "collections": self.__collections[gen],
+                 "total_pause": self.__total_pause[gen],
+                 "max_pause": self.__max_pause[gen]} for gen in range(3)]
+
+    @property
+    def enabled(self):
+        return self.__enabled
+
+    @property
+    def last_pause(self):
+        return self.__last_pause
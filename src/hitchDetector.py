@@ -0,0 +1,187 @@
+import os
+import sys
+import time
+import threading
+from collections import Counter
+from profiler import PHASE_FIXED_UPDATE, PHASE_TASKS, PHASE_DATA_GRAPH, PHASE_EVENTS, \
+    PHASE_MOUSE, PHASE_SCENE_CAM, PHASE_CALLBACKS, PHASE_RENDER
+
+
+# phases of Engine.update in order, each is marked when it ends
+PHASES = (PHASE_FIXED_UPDATE, PHASE_TASKS, PHASE_DATA_GRAPH, PHASE_EVENTS,
+          PHASE_MOUSE, PHASE_SCENE_CAM, PHASE_CALLBACKS, PHASE_RENDER)
+
+
+class HitchDetector(object):
+    """Watchdog thread which notices when a frame (one Engine.update) runs
+    longer than budget seconds, and samples main thread's python stack
+    until the frame ends.
+
+    Each hitch is saved as a collapsed stack file (flamegraph.pl, speedscope)
+    in output_dir, stacks are rooted at frame number and the phase of
+    Engine.update the sample was taken in, phase timings of the frame are
+    written as comment lines at top of file.
+
+    When enabled, cost on main thread is a few attribute writes per phase,
+    the watchdog only polls the current frame's start time until a hitch."""
+
+    def __init__(self, budget=0.1, sample_interval=0.001, output_dir="hitches",
+                 max_reports=100):
+        object.__init__(self)
+
+        self.budget = budget                    # seconds
+        self.sample_interval = sample_interval  # seconds between samples
+        self.output_dir = output_dir
+        self.max_reports = max_reports
+
+        self.__enabled = False
+        self.__thread = None
+        self.__main_thread_id = None
+
+        # (frame number, start time) of frame in progress, None between
+        # frames, replaced as a whole so watchdog never sees a torn value
+        self.__current = None
+        self.__marks = []  # (phase, end time) of phases of current frame
+
+        self.__hitch_frame = None
+        self.__finished = threading.Event()  # set when hitch frame ends
+        self.__finished_marks = None
+        self.__finished_end = 0
+
+        self.__reports = 0
+        self.__last_report = None
+
+    def enable(self):
+        if self.__enabled:
+            return
+
+        self.__enabled = True
+        self.__main_thread_id = threading.get_ident()
+        self.__thread = threading.Thread(target=self.__watch, name="HitchDetector",
+                                         daemon=True)
+        self.__thread.start()
+
+    def disable(self):
+        self.__enabled = False
+        self.__current = None
+        self.__finished.set()
+
+        if self.__thread is not None:
+            self.__thread.join()
+            self.__thread = None
+
+    def begin_frame(self, frame):
+        self.__marks = []
+        self.__current = (frame, time.perf_counter())
+
+    def mark(self, phase):
+        self.__marks.append((phase, time.perf_counter()))
+
+    def end_frame(self):
+        current = self.__current
+        self.__current = None
+
+        # hand phase timings of a hitch frame over to watchdog
+        if current is not None and current[0] == self.__hitch_frame:
+            self.__finished_marks = self.__marks
+            self.__finished_end = time.perf_counter()
+            self.__finished.set()
+
+    def __watch(self):
+        poll_interval = min(0.01, self.budget / 4)
+
+        while self.__enabled:
+            current = self.__current
+            if current is None or time.perf_counter() - current[1] < self.budget:
+                time.sleep(poll_interval)
+                continue
+
+            frame, start = current
+            self.__finished.clear()
+            self.__hitch_frame = frame
+
+            samples = self.__sample(current)
+
+            # wait for end_frame to pass phase timings
+            self.__finished.wait(1.0)
+            self.__hitch_frame = None
+
+            if not self.__enabled:
+                break
+
+            marks = self.__finished_marks or []
+            end = self.__finished_end if self.__finished_marks else time.perf_counter()
+            self.__finished_marks = None
+
+            if self.__reports < self.max_reports:
+                self.__reports += 1
+                self.save_report(frame, start, end, marks, samples)
+
+            # skip frames already in progress
+            while self.__enabled and self.__current is current:
+                time.sleep(poll_interval)
+
+    def __sample(self, current):
+        """Samples main thread's stack while given frame is running."""
+
+        samples = Counter()
+        marks = self.__marks
+        main_id = self.__main_thread_id
+        interval = self.sample_interval
+
+        while self.__enabled and self.__current is current:
+            frame = sys._current_frames().get(main_id)
+            if frame is not None:
+                phase = PHASES[len(marks)] if len(marks) < len(PHASES) else "Other"
+                samples[(phase, self.collapse(frame))] += 1
+
+            # release frame object, it keeps main thread's locals alive
+            frame = None
+            time.sleep(interval)
+
+        return samples
+
+    @staticmethod
+    def collapse(frame):
+        """Returns stack of frame as a string of functions, outermost first,
+        separated by semicolons."""
+
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append("{0} ({1}:{2})".format(code.co_name,
+                                                os.path.basename(code.co_filename),
+                                                code.co_firstlineno))
+            frame = frame.f_back
+
+        names.reverse()
+        return ";".join(names)
+
+    def save_report(self, frame, start, end, marks, samples):
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, "hitch_frame_{0}.folded".format(frame))
+
+        with open(path, "w") as file:
+            file.write("# hitch in frame {0}, {1:.2f} ms, budget {2:.2f} ms\n".format(
+                frame, (end - start) * 1000, self.budget * 1000))
+
+            last = start
+            for phase, time_ in marks:
+                file.write("# phase {0} {1:.2f} ms\n".format(phase, (time_ - last) * 1000))
+                last = time_
+
+            root = "frame_{0}".format(frame)
+            for (phase, stack), count in samples.most_common():
+                file.write("{0};{1};{2} {3}\n".format(root, phase, stack, count))
+
+        self.__last_report = path
+        print("-- Hitch in frame {0}, {1:.1f} ms, stack samples saved to {2}".format(
+            frame, (end - start) * 1000, path))
+
+    @property
+    def enabled(self):
+        return self.__enabled
+
+    @property
+    def last_report(self):
+        return self.__last_report
@@ -0,0 +1,107 @@
+import random
+import panda3d.core as p3d
+
+
+class InputRecorder(object):
+    """Records mouse and keyboard input flowing through the data graph to a
+    session file, and plays it back into the data graph at the same frame
+    indices, so editor interactions (selection, gizmo drags, camera orbit)
+    can be replayed repeatably, also in headless runs.
+
+    While recording, a MouseRecorder node attached to the input device saves
+    mouse position and button events it receives each frame, during playback
+    it is put between the input device and all mouse watchers and outputs
+    recorded data instead of live input, events are then thrown by button
+    throwers as if the input were live.
+    The recorder node is only in the data graph while a session is active,
+    it passes input on with a frame of delay, so it is kept out of the path
+    of live input while recording.
+    See direct.showbase.ShowBase for the record-session/playback-session
+    equivalent."""
+
+    def __init__(self):
+        object.__init__(self)
+
+        self.__controller = None
+        self.__mouse_recorder = p3d.MouseRecorder("InputRecorder")
+        self.__np = p3d.NodePath(self.__mouse_recorder)
+        self.__input_np = None
+
+    def attach(self, input_np):
+        """Sets data graph node of input device to record from."""
+        self.__input_np = input_np
+
+    def begin_record(self, path):
+        self.stop()
+
+        controller = p3d.RecorderController()
+        if not controller.begin_record(p3d.Filename.fromOsSpecific(path)):
+            print("-- Unable to record input session to {0}".format(path))
+            return False
+
+        self.__start(controller)
+        self.__np.reparentTo(self.__input_np)
+        print("-- Recording input session to {0}".format(path))
+        return True
+
+    def begin_playback(self, path):
+        self.stop()
+
+        controller = p3d.RecorderController()
+        if not controller.begin_playback(p3d.Filename.fromOsSpecific(path)):
+            print("-- Unable to play back input session {0}".format(path))
+            return False
+
+        self.__start(controller)
+        self.__np.reparentTo(self.__input_np)
+
+        # mouse watchers are fed from recorder instead of input device
+        for child in self.__input_np.getChildren():
+            if child != self.__np:
+                child.reparentTo(self.__np)
+
+        print("-- Playing back input session {0}".format(path))
+        return True
+
+    def __start(self, controller):
+        controller.add_recorder("mouse", self.__mouse_recorder)
+
+        # same seed as recorded session, for anything using random
+        random.seed(controller.get_random_seed())
+        self.__controller = controller
+
+    def stop(self):
+        if self.__controller is None:
+            return
+
+        for child in self.__np.getChildren():
+            child.reparentTo(self.__input_np)
+        self.__np.detachNode()
+
+        self.__controller.close()
+        self.__controller = None
+
+    def record_frame(self):
+        """Should be called each frame after data graph has been traversed
+        and before the frame is rendered."""
+        if self.__controller and self.__controller.is_recording():
+            self.__controller.record_frame()
+
+    def play_frame(self):
+        """Should be called each frame after the frame is rendered, reads
+        input for next frame."""
+        controller = self.__controller
+        if controller and controller.is_playing():
+            controller.play_frame()
+
+            if not controller.is_playing():
+                print("-- Input session playback finished")
+                self.stop()
+
+    @property
+    def is_recording(self):
+        return self.__controller is not None and self.__controller.is_recording()
+
+    @property
+    def is_playing(self):
+        return self.__controller is not None and self.__controller.is_playing()
@@ -2,9 +2,12 @@ from panda3d.core import Point3, Vec3, Plane, NodePath
 from .constants import *
 from utils import SingleTask, math
 from system import Systems
+from pstatsRecorder import EDITOR_GIZMOS
 
 
 class Base(NodePath, SingleTask):
+    stat_group = EDITOR_GIZMOS
+
     def __init__(self, name, *args, **kwargs):
         NodePath.__init__(self, name)
         SingleTask.__init__(self, name)
@@ -25,6 +28,15 @@ class Base(NodePath, SingleTask):
         self.planar = False
         self.local = False
 
+        # mouse picker events of this gizmo's node, names are interned
+        # into event ids once
+        evt_mgr = Systems.demon.event_manager
+        self.__node_events = (
+            (evt_mgr.get_event_id(name + '-mouse1'), self.on_node_mouse1_down),
+            (evt_mgr.get_event_id(name + '-control-mouse1'), self.on_node_mouse1_down),
+            (evt_mgr.get_event_id(name + '-mouse-over'), self.on_node_mouse_over),
+            (evt_mgr.get_event_id(name + '-mouse-leave'), self.on_node_mouse_leave))
+
         # Set this node up to be drawn over everything else
         self.setBin('fixed', 40)
         self.setDepthTest(False)
@@ -37,6 +49,7 @@ class Base(NodePath, SingleTask):
         """
         if self.dragging:
             self.transform()
+            Systems.demon.engine.mark_dirty()
 
         scale = (self.getPos() - self.camera.getPos()).length() / 6
         self.setScale(scale)
@@ -66,18 +79,8 @@ class Base(NodePath, SingleTask):
         self.detachNode()
         
         evt_mgr = Systems.demon.event_manager
-        
-        evt_mgr.remove(''.join([self.name, '-mouse1']),
-                       self.on_node_mouse1_down)
-                       
-        evt_mgr.remove(''.join([self.name, '-control-mouse1']),
-                       self.on_node_mouse1_down)
-                       
-        evt_mgr.remove(''.join([self.name, '-mouse-over']),
-                       self.on_node_mouse_over)
-                       
-        evt_mgr.remove(''.join([self.name, '-mouse-leave']),
-                       self.on_node_mouse_leave)
+        for event_id, handler in self.__node_events:
+            evt_mgr.remove(event_id, handler)
 
     def accept_events(self):
         """Bind all events for the gizmo."""
@@ -86,18 +89,8 @@ class Base(NodePath, SingleTask):
         Systems.demon.accept('mouse2', self.on_mouse2_down)
         
         evt_mgr = Systems.demon.event_manager
-        
-        evt_mgr.register(''.join([self.name, '-mouse1']),
-                         self.on_node_mouse1_down)
-                         
-        evt_mgr.register(''.join([self.name, '-control-mouse1']),
-                         self.on_node_mouse1_down)
-                                
-        evt_mgr.register(''.join([self.name, '-mouse-over']),
-                         self.on_node_mouse_over)
-                         
-        evt_mgr.register(''.join([self.name, '-mouse-leave']),
-                         self.on_node_mouse_leave)
+        for event_id, handler in self.__node_events:
+            evt_mgr.register(event_id, handler)
                          
     def ignore_events(self):
         pass
@@ -204,6 +197,8 @@ class Base(NodePath, SingleTask):
             if not axis.selected:
                 axis.unhighlight()
 
+        Systems.demon.engine.mark_dirty()
+
     def on_node_mouse1_down(self, planar, collEntry):
         self.planar = planar
         self.dragging = True
@@ -251,6 +246,8 @@ class Base(NodePath, SingleTask):
         if axis is not None:
             axis.highlight()
 
+        Systems.demon.engine.mark_dirty()
+
     def get_mouse_plane_collision_point(self, pos, nrml):
         """
         Return the collision point of a ray fired through the mouse and a
@@ -10,7 +10,10 @@ class Manager(object):
         self.__root_np = kwargs.pop("rootNP")
 
         self.__gizmos = {}
+        self.__factories = {}  # name: callable creating the gizmo on first use
         self.__local = False
+        self.__size = 1
+        self.__attached_nps = []
         self.__active_gizmo = None
         
         # Create gizmo manager mouse picker
@@ -36,6 +39,22 @@ class Manager(object):
             
         return gizmo
 
+    def add_gizmo_factory(self, name, factory):
+        """Adds a callable that creates a gizmo, the gizmo is only created
+        when it is first asked for."""
+        self.__factories[name] = factory
+
+    def __create_gizmo(self, name):
+        gizmo = self.add_gizmo(self.__factories.pop(name)())
+
+        # bring it up to date with the rest of gizmos
+        gizmo.local = self.__local
+        if self.__size != 1:
+            gizmo.set_size(self.__size)
+        gizmo.attach_nodepaths(self.__attached_nps)
+
+        return gizmo
+
     def get_gizmo(self, name):
         """
         Find and return a gizmo by name, return None if no gizmo with the
@@ -44,6 +63,9 @@ class Manager(object):
         if name in self.__gizmos:
             return self.__gizmos[name]
 
+        if name in self.__factories:
+            return self.__create_gizmo(name)
+
         return None
 
     def get_active_gizmo(self):
@@ -78,6 +100,7 @@ class Manager(object):
 
     def set_size(self, factor):
         """Resize the gizmo by a factor."""
+        self.__size *= factor
         for gizmo in self.__gizmos.values():
             gizmo.set_size(factor)
 
@@ -87,6 +110,8 @@ class Manager(object):
         if nps is None:
             nps = []
 
+        self.__attached_nps = nps
+
         for gizmo in self.__gizmos.values():
             gizmo.attach_nodepaths(nps)
 
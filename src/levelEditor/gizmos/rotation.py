@@ -128,7 +128,7 @@ class Rotation(Base):
         # Probably should be a better way to do this.
         self.cam_axis.coll_node_paths[0].lookAt(self.__camera)
 
-        return task.cont
+        return task.DS_cont
 
     def transform(self):
         startVec = self.start_vec
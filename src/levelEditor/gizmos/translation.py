@@ -1,10 +1,9 @@
 import panda3d.core as pm
 
-from direct.directtools.DirectUtil import ROUND_TO
 from system import Systems
 
 from utils.geometry import Cone, Square, Line
-from utils.math import snap_point, scale_point
+from utils.math import snap_point, scale_point, round_to
 from .axis import Axis
 from .base import Base
 from .constants import *
@@ -63,7 +62,7 @@ class Translation(Base):
 
     def _snap(self, vec):
         if vec.length():
-            snpLen = ROUND_TO(vec.length(), self.snpAmt)
+            snpLen = round_to(vec.length(), self.snpAmt)
             snapVec = vec / vec.length() * snpLen
             return snapVec
         else:
@@ -59,6 +59,7 @@ class LevelEditor(object):
         self.accept_event("mouse1", self.on_mouse1)
         self.accept_event("shift-mouse1", self.on_mouse1, True)
         self.accept_event("mouse1-up", self.on_mouse1_up),
+        self.accept_event("control-a", self.select_all),
 
         self.accept_event("w", self.set_active_gizmo, POS_GIZMO),
         self.accept_event("r", self.set_active_gizmo, ROT_GIZMO),
@@ -136,7 +137,26 @@ class LevelEditor(object):
         pass
 
     def select_all(self):
-        pass
+        """selects all selectable nodepaths, a part each frame, returns the
+        work queue job"""
+        def on_done(nps):
+            self.__xform_gizmo_mgr.attach_nodepaths(nps)
+            self.__xform_gizmo_mgr.refresh_active_gizmo()
+
+        return self.__demon.engine.work_queue.submit(self.__selection.select_all_job(),
+                                                     "Select all", on_done=on_done)
+
+    def select(self, nps, append=False):
+        """selects given nodepaths, as if they were picked with the mouse"""
+        if not nps:
+            self.deselect_all()
+            return
+
+        self.__selection.set_selected(nps, append)
+
+        # update gizmos
+        self.__xform_gizmo_mgr.attach_nodepaths(self.__selection.selected_nps)
+        self.__xform_gizmo_mgr.refresh_active_gizmo()
 
     def deselect_all(self):
         self.__selection.selected_nps = []
@@ -160,9 +180,11 @@ class LevelEditor(object):
         
         gizmo_mgr = gizmos.Manager(**kwargs)
         
-        pos_gizmo = gizmo_mgr.add_gizmo(gizmos.Translation(POS_GIZMO, **kwargs))
-        rot_gizmo = gizmo_mgr.add_gizmo(gizmos.Rotation(ROT_GIZMO, **kwargs))
-        scale_gizmo = gizmo_mgr.add_gizmo(gizmos.Scale(SCALE_GIZMO, **kwargs))
+        # gizmos are created when first activated, they are not needed
+        # to render the first frame
+        gizmo_mgr.add_gizmo_factory(POS_GIZMO, lambda: gizmos.Translation(POS_GIZMO, **kwargs))
+        gizmo_mgr.add_gizmo_factory(ROT_GIZMO, lambda: gizmos.Rotation(ROT_GIZMO, **kwargs))
+        gizmo_mgr.add_gizmo_factory(SCALE_GIZMO, lambda: gizmos.Scale(SCALE_GIZMO, **kwargs))
         
         self.__xform_gizmo_mgr = gizmo_mgr
         self.__xform_gizmo_np = root_np
@@ -225,3 +247,7 @@ class LevelEditor(object):
     
     def add_node(self, path):
         pass
+
+    @property
+    def selected_nps(self):
+        return self.__selection.selected_nps
@@ -3,6 +3,12 @@ from panda3d.core import CollisionNode, CollisionRay
 from panda3d.core import AsyncTaskManager, PythonTask
 from system import Systems
 from utils.singleTask import SingleTask
+from pstatsRecorder import pstats_recorder, EDITOR_PICKING
+
+
+# python tag on picked nodes, caching (node name, event manager generation,
+# {event suffix: event id, or event name if it has no handlers})
+EVENT_IDS_TAG = "MousePickerEventIds"
 
 
 class MousePicker:
@@ -49,6 +55,7 @@ class MousePicker:
             task = PythonTask(self.update, '%s%s' % (name, "Task"))
             AsyncTaskManager.getGlobalPtr().add(task)
 
+    @pstats_recorder.timed(EDITOR_PICKING)
     def update(self, task=None, x=None, y=None):
         # Update the ray's position
         if self.__mwn.hasMouse():
@@ -79,15 +86,18 @@ class MousePicker:
 
             # If this node is different to the last node, send a mouse leave
             # event to the last node, and a mouse enter to the new node
+            # hover events are queued and dispatched once a frame, only
+            # the last mouse over of a node is kept
             if node != self.__node:
                 if self.__node is not None:
-                    Systems.evt_mgr.trigger('%s-mouse-leave' % self.__node.getName())
+                    Systems.evt_mgr.post(self.get_event_id(self.__node, 'mouse-leave'))
                     
-                Systems.evt_mgr.trigger('%s-mouse-enter' % node.getName(), [collEntry])
+                Systems.evt_mgr.post(self.get_event_id(node, 'mouse-enter'), [collEntry])
 
             # Send a message containing the node name and the event over name,
             # including the collision entry as arguments
-            Systems.evt_mgr.trigger('%s-mouse-over' % node.getName(), collEntry)
+            event_id = self.get_event_id(node, 'mouse-over')
+            Systems.evt_mgr.post_coalesced(event_id, event_id, collEntry)
             
             # Keep these values
             self.__coll_entry = collEntry
@@ -97,7 +107,7 @@ class MousePicker:
             # No collisions, clear the node and send a mouse leave to the last
             # node that stored
             # messenger.send('%s-mouse-leave' % self.__node.getName(), [self.__coll_entry])
-            Systems.evt_mgr.trigger('%s-mouse-leave' % self.__node.getName())
+            Systems.evt_mgr.post(self.get_event_id(self.__node, 'mouse-leave'))
             self.__node = None
             
         if task:
@@ -110,10 +120,36 @@ class MousePicker:
         """
 
         if self.__node is not None:
-            args = [False, self.__coll_entry]
-            Systems.evt_mgr.trigger('%s-%s' % (self.__node.getName(), event),
+            Systems.evt_mgr.trigger(self.get_event_id(self.__node, event),
                                     False, self.__coll_entry)
 
+    @staticmethod
+    def get_event_id(node, event):
+        """
+        Returns event manager id of the '<node name>-<event>' event, ids are
+        cached on the node, so the name is only formatted once per node and
+        event, or again after the node is renamed. Events no handler was
+        ever registered for have no id, their name is returned instead and
+        they are not interned, so hovering over nodes doesn't grow the
+        event manager's tables. Names are cached too, until a handler is
+        registered for any event that had none.
+        """
+        name = node.getName()
+        generation = Systems.evt_mgr.generation
+        cached = node.getPythonTag(EVENT_IDS_TAG)
+        if cached is None or cached[0] != name or cached[1] != generation:
+            cached = (name, generation, {})
+            node.setPythonTag(EVENT_IDS_TAG, cached)
+
+        event_id = cached[2].get(event)
+        if event_id is None:
+            event_name = '%s-%s' % (name, event)
+            event_id = Systems.evt_mgr.find_event_id(event_name)
+            if event_id is None:
+                event_id = event_name
+            cached[2][event] = event_id
+        return event_id
+
     def get_first_np(self):
         """
         Return the first node in the collision queue if there is one, None
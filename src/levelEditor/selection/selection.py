@@ -1,6 +1,7 @@
 from panda3d.core import GeomNode, CollisionNode, BitMask32
 from levelEditor.constants import selectable_node_tag
 from system import Systems
+from pstatsRecorder import pstats_recorder, EDITOR_SELECTION
 from utils import Marquee
 from . import MousePicker
 
@@ -41,11 +42,15 @@ class Selection:
         for np in self.selected_nps:
             np.showTightBounds()
 
+        Systems.demon.engine.mark_dirty()
+
     def deselect_all(self):
         for np in self.selected_nps:
             np.hideBounds()
         self.selected_nps.clear()
 
+        Systems.demon.engine.mark_dirty()
+
     def start_drag_select(self, append=False):
         """
         Start the marquee and put the tool into append mode if specified.
@@ -54,6 +59,7 @@ class Selection:
             self.__append = append
             self.marquee.start()
 
+    @pstats_recorder.timed(EDITOR_SELECTION)
     def stop_drag_select(self, double_click=False):
         """
         Stop the marquee and get all the node paths under it with the correct
@@ -103,6 +109,30 @@ class Selection:
                 
         return self.selected_nps
 
+    def select_all_job(self, chunk=200):
+        """
+        Generator selecting all selectable node paths, yields progress every
+        chunk nodes, to be run by engine's work queue.
+        """
+        nps = self.render.findAllMatches('**')
+        num_nps = nps.getNumPaths()
+        new_selections = []
+        seen = set()
+
+        for i in range(num_nps):
+            np = nps.getPath(i)
+            if np.hasNetTag(selectable_node_tag):
+                new_np = self.get_selected_np(np)
+                if new_np not in seen:
+                    seen.add(new_np)
+                    new_selections.append(new_np)
+
+            if i % chunk == chunk - 1:
+                yield (i + 1) / num_nps
+
+        self.set_selected(new_selections)
+        return self.selected_nps
+
     def get_np_under_mouse(self):
         """
         Returns the closest node under the mouse, or None if there isn't one.
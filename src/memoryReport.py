@@ -0,0 +1,255 @@
+import os
+import sys
+import time
+from collections import deque
+import tracemalloc
+import panda3d.core as p3d
+
+
+# python allocations are grouped by the subsystem of the file that made
+# them, directories are relative to src, first match wins
+SUBSYSTEM_DIRS = (("loader", "loader"),
+                  ("levelEditor", "levelEditor"),
+                  ("game", "game"),
+                  ("editor", ""))
+
+SUBSYSTEM_PROJECT = "project"
+SUBSYSTEM_PANDA = "panda3d"
+SUBSYSTEM_OTHER = "other"
+
+
+class MemorySnapshot(object):
+    """Memory use at one point in time, see MemoryReport.take_snapshot."""
+
+    def __init__(self, label):
+        object.__init__(self)
+
+        self.label = label
+        self.time = time.time()
+
+        self.python = {}          # subsystem: bytes traced by tracemalloc
+        self.trace = None         # tracemalloc.Snapshot
+
+        self.vertex_bytes = 0     # vertex and index data in scene graphs
+        self.texture_bytes = 0    # ram images of textures in TexturePool
+        self.textures = 0
+        self.models = []          # names of models in ModelPool
+
+        self.project_modules = 0  # project scripts in sys.modules
+        self.components = 0       # component instances attached to nodes
+
+    def to_dict(self):
+        return {"label": self.label,
+                "time": self.time,
+                "python": dict(self.python),
+                "vertex_bytes": self.vertex_bytes,
+                "texture_bytes": self.texture_bytes,
+                "textures": self.textures,
+                "models": len(self.models),
+                "project_modules": self.project_modules,
+                "components": self.components}
+
+
+class MemoryReport(object):
+    """Takes snapshots of memory used by the editor, python allocations
+    traced with tracemalloc and grouped by subsystem (loader, level editor,
+    game, project scripts...), along with panda side numbers, vertex data
+    of scene graphs, ram images of pooled textures and ModelPool contents.
+    Two snapshots can be diffed, e.g. before and after a script reload.
+
+    Tracing is only started by enable, it slows down python allocations
+    noticeably, panda side numbers are available without it.
+
+    Only the last max_snapshots snapshots are kept, and only the last two
+    keep their tracemalloc trace, so taking snapshots doesn't grow the
+    memory it reports."""
+
+    def __init__(self, demon, trace_frames=1, max_snapshots=16):
+        object.__init__(self)
+
+        self.__demon = demon
+        self.trace_frames = trace_frames
+        self.__src_dir = os.path.dirname(os.path.abspath(__file__))
+        panda_dir = os.path.dirname(os.path.abspath(p3d.__file__))
+        self.__panda_dirs = (panda_dir, os.path.join(os.path.dirname(panda_dir), "direct"))
+
+        self.__snapshots = deque(maxlen=max_snapshots)
+        self.__num_taken = 0
+        self.__subsystems = {}  # file name: subsystem, cache
+
+    def enable(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.trace_frames)
+            print("-- Memory tracing started")
+
+    def disable(self):
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def take_snapshot(self, label=None):
+        self.__num_taken += 1
+        snapshot = MemorySnapshot(label or "snapshot {0}".format(self.__num_taken))
+
+        if tracemalloc.is_tracing():
+            snapshot.trace = tracemalloc.take_snapshot().filter_traces(
+                (tracemalloc.Filter(False, tracemalloc.__file__),))
+
+            for stat in snapshot.trace.statistics("filename"):
+                subsystem = self.get_subsystem(stat.traceback[0].filename)
+                snapshot.python[subsystem] = snapshot.python.get(subsystem, 0) + stat.size
+
+        demon = self.__demon
+        snapshot.vertex_bytes = self.get_vertex_bytes(demon.engine.render, demon.game.render)
+        snapshot.texture_bytes, snapshot.textures = self.get_texture_bytes()
+        snapshot.models = self.get_pooled_models()
+
+        project_dir = self.__get_project_dir()
+        snapshot.project_modules = sum(1 for module in list(sys.modules.values())
+                                       if project_dir and
+                                       (getattr(module, "__file__", None) or "").startswith(project_dir))
+        snapshot.components = sum(len(comps) for comps in
+                                  demon.game.get_attached_components().values())
+
+        # traces are only needed to diff against the previous snapshot
+        if len(self.__snapshots) > 1:
+            self.__snapshots[-2].trace = None
+
+        self.__snapshots.append(snapshot)
+        return snapshot
+
+    def get_subsystem(self, filename):
+        subsystem = self.__subsystems.get(filename)
+        if subsystem is not None:
+            return subsystem
+
+        path = os.path.abspath(filename)
+        project_dir = self.__get_project_dir()
+
+        if project_dir and path.startswith(project_dir):
+            subsystem = SUBSYSTEM_PROJECT
+        elif path.startswith(self.__panda_dirs):
+            subsystem = SUBSYSTEM_PANDA
+        elif path.startswith(self.__src_dir):
+            subsystem = SUBSYSTEM_OTHER
+            relative = os.path.relpath(path, self.__src_dir)
+            for name, directory in SUBSYSTEM_DIRS:
+                if not directory or relative.startswith(directory + os.sep):
+                    subsystem = name
+                    break
+        else:
+            subsystem = SUBSYSTEM_OTHER
+
+        self.__subsystems[filename] = subsystem
+        return subsystem
+
+    def __get_project_dir(self):
+        path = self.__demon.project.path
+        return os.path.abspath(path) if path else None
+
+    @staticmethod
+    def get_vertex_bytes(*roots):
+        """Returns bytes of vertex and index data under given nodes, data
+        shared by several geoms is counted once."""
+        seen = set()
+        total = 0
+
+        for root in roots:
+            for np in root.findAllMatches("**/+GeomNode"):
+                for geom in np.node().getGeoms():
+                    arrays = list(geom.getVertexData().getArrays())
+                    arrays.extend(prim.getVertices() for prim in geom.getPrimitives()
+                                  if prim.isIndexed())
+
+                    for array in arrays:
+                        if array.this not in seen:
+                            seen.add(array.this)
+                            total += array.getDataSizeBytes()
+
+        return total
+
+    @staticmethod
+    def get_texture_bytes():
+        """Returns (ram image bytes, number of textures) of textures in
+        TexturePool, mipmap levels included."""
+        total = 0
+        textures = p3d.TexturePool.findAllTextures()
+
+        for texture in textures:
+            total += sum(texture.getRamMipmapImageSize(i)
+                         for i in range(texture.getNumRamMipmapImages()))
+
+        return total, len(textures)
+
+    @staticmethod
+    def get_pooled_models():
+        stream = p3d.StringStream()
+        p3d.ModelPool.listContents(stream)
+
+        # first line is a title, last one totals, models are followed by
+        # an indented reference count
+        lines = stream.getData().decode("utf-8", "replace").splitlines()[1:-1]
+        return [line for line in lines if line and not line.startswith(" ")]
+
+    def diff(self, old, new, top=10):
+        """Prints differences between two snapshots, and top allocation
+        sites that grew the most if both were traced, returns {name: delta}."""
+        deltas = {}
+        for subsystem in sorted(set(old.python) | set(new.python)):
+            deltas["python:" + subsystem] = new.python.get(subsystem, 0) - old.python.get(subsystem, 0)
+
+        for name in ("vertex_bytes", "texture_bytes", "textures", "project_modules", "components"):
+            deltas[name] = getattr(new, name) - getattr(old, name)
+        deltas["models"] = len(new.models) - len(old.models)
+
+        print("-- Memory diff, {0} -> {1}".format(old.label, new.label))
+        for name, delta in deltas.items():
+            if delta:
+                print("   {0:>+14,}  {1}".format(delta, name))
+
+        added = sorted(set(new.models) - set(old.models))
+        if added:
+            print("   models added to ModelPool: {0}".format(", ".join(added)))
+
+        if old.trace is not None and new.trace is not None:
+            print("   top allocation sites")
+            for stat in new.trace.compare_to(old.trace, "lineno")[:top]:
+                frame = stat.traceback[0]
+                print("   {0:>+14,}  {1}:{2} ({3})".format(stat.size_diff, frame.filename,
+                                                         frame.lineno,
+                                                         self.get_subsystem(frame.filename)))
+
+        return deltas
+
+    def print_snapshot(self, snapshot):
+        print("-- Memory, {0}".format(snapshot.label))
+        for subsystem, size in sorted(snapshot.python.items(), key=lambda item: -item[1]):
+            print("   {0:>14,}  python:{1}".format(size, subsystem))
+        print("   {0:>14,}  vertex data".format(snapshot.vertex_bytes))
+        print("   {0:>14,}  texture ram images ({1} textures)".format(snapshot.texture_bytes,
+                                                                     snapshot.textures))
+        print("   {0:>14}  models in ModelPool".format(len(snapshot.models)))
+        print("   {0:>14}  project modules".format(snapshot.project_modules))
+        print("   {0:>14}  components".format(snapshot.components))
+
+    def report(self):
+        """Takes a snapshot and prints it, along with a diff against the
+        previous one, bound to a hotkey."""
+        previous = self.__snapshots[-1] if self.__snapshots else None
+        snapshot = self.take_snapshot()
+
+        self.print_snapshot(snapshot)
+        if previous is not None:
+            self.diff(previous, snapshot)
+
+        return snapshot
+
+    def clear(self):
+        self.__snapshots.clear()
+
+    @property
+    def snapshots(self):
+        return list(self.__snapshots)
+
+    @property
+    def tracing(self):
+        return tracemalloc.is_tracing()
@@ -0,0 +1,248 @@
+import os
+import time
+from array import array
+from panda3d.core import AsyncTaskManager, PythonTask
+
+
+# phases of Engine.update, in order of execution
+PHASE_FRAME = "Frame"
+PHASE_FIXED_UPDATE = "FixedUpdate"
+PHASE_TASKS = "TaskManagerPoll"
+PHASE_DATA_GRAPH = "DataGraphTraverse"
+PHASE_EVENTS = "ProcessEvents"
+PHASE_MOUSE = "MouseUpdate"
+PHASE_SCENE_CAM = "SceneCameraUpdate"
+PHASE_CALLBACKS = "UpdateCallbacks"
+PHASE_RENDER = "RenderFrame"
+
+# trace event categories
+CAT_FRAME = "frame"
+CAT_PHASE = "phase"
+CAT_TASK = "task"
+CAT_GC = "gc"
+
+
+class FrameProfiler(object):
+    """Records wall times of each phase of a frame and of every python task run
+    by the global AsyncTaskManager, into a fixed size ring buffer.
+    Records can be saved as a chrome trace (chrome://tracing, ui.perfetto.dev).
+
+    When disabled, the only cost is a single attribute check per frame in
+    Engine.update."""
+
+    def __init__(self, capacity=65536, trace_path="frame_trace.json"):
+        object.__init__(self)
+
+        self.__enabled = False
+        self.trace_path = trace_path
+
+        # ring buffer, records are stored in parallel preallocated arrays
+        # so recording does not allocate.
+        self.__capacity = capacity
+        self.__names = [None] * capacity
+        self.__cats = [None] * capacity
+        self.__starts = array('d', [0]) * capacity
+        self.__durations = array('d', [0]) * capacity
+        self.__frames = array('l', [0]) * capacity
+        self.__index = 0
+        self.__count = 0
+
+        # per frame state
+        self.__frame = 0
+        self.__frame_start = 0
+        self.__last_mark = 0
+
+        # task_id: original function of profiled python tasks
+        self.__task_funcs = {}
+        self.__num_tasks = -1
+
+    def enable(self):
+        self.__enabled = True
+
+    def disable(self):
+        self.__enabled = False
+        self.unwatch_tasks()
+
+    def toggle(self):
+        self.disable() if self.__enabled else self.enable()
+        print("-- Frame profiler {0}".format("on" if self.__enabled else "off"))
+
+    def clear(self):
+        self.__index = 0
+        self.__count = 0
+
+    def record(self, name, cat, start, end):
+        i = self.__index
+        self.__names[i] = name
+        self.__cats[i] = cat
+        self.__starts[i] = start
+        self.__durations[i] = end - start
+        self.__frames[i] = self.__frame
+
+        self.__index = (i + 1) % self.__capacity
+        if self.__count < self.__capacity:
+            self.__count += 1
+
+    def begin_frame(self, frame):
+        self.__frame = frame
+        self.__frame_start = self.__last_mark = time.perf_counter()
+
+        # wrap any new python tasks, the task count is checked first to
+        # avoid walking all tasks every frame.
+        num_tasks = AsyncTaskManager.getGlobalPtr().getNumTasks()
+        if num_tasks != self.__num_tasks:
+            self.watch_tasks()
+            self.__num_tasks = num_tasks
+
+    def mark(self, phase):
+        """Ends the phase started by last call to mark or begin_frame."""
+        now = time.perf_counter()
+        self.record(phase, CAT_PHASE, self.__last_mark, now)
+        self.__last_mark = now
+
+    def end_frame(self):
+        self.record(PHASE_FRAME, CAT_FRAME, self.__frame_start, time.perf_counter())
+
+    def watch_tasks(self):
+        """Wraps the functions of all active python tasks to record their run
+        times."""
+
+        for task in AsyncTaskManager.getGlobalPtr().getTasks():
+            if not isinstance(task, PythonTask):
+                continue
+
+            task_id = task.get_task_id()
+            if task_id in self.__task_funcs:
+                continue
+
+            func = task.get_function()
+            self.__task_funcs[task_id] = func
+            task.set_function(self.__wrap_task(task.get_name(), func))
+
+        # forget about tasks which are no longer running
+        task_ids = set(task.get_task_id() for task in
+                       AsyncTaskManager.getGlobalPtr().getTasks())
+        for task_id in [id_ for id_ in self.__task_funcs if id_ not in task_ids]:
+            del self.__task_funcs[task_id]
+
+    def unwatch_tasks(self):
+        """Restores the original functions of profiled python tasks."""
+
+        for task in AsyncTaskManager.getGlobalPtr().getTasks():
+            func = self.__task_funcs.get(task.get_task_id(), None)
+            if func is not None:
+                task.set_function(func)
+
+        self.__task_funcs.clear()
+        self.__num_tasks = -1
+
+    def __wrap_task(self, name, func):
+        record = self.record
+        perf_counter = time.perf_counter
+
+        def _profiled(*args):
+            start = perf_counter()
+            try:
+                return func(*args)
+            finally:
+                record(name, CAT_TASK, start, perf_counter())
+
+        return _profiled
+
+    def get_records(self):
+        """Returns all records in ring buffer, oldest first, as a list of
+        (frame, category, name, start, duration) tuples."""
+
+        start = (self.__index - self.__count) % self.__capacity
+        records = []
+
+        for i in range(self.__count):
+            j = (start + i) % self.__capacity
+            records.append((self.__frames[j], self.__cats[j], self.__names[j],
+                            self.__starts[j], self.__durations[j]))
+
+        return records
+
+    def get_phase_times(self, frame=None):
+        """Returns a dict of phase name: duration in seconds, for the given
+        frame or the last recorded frame if None."""
+
+        records = [rec for rec in self.get_records() if rec[1] == CAT_PHASE]
+        if not records:
+            return {}
+
+        if frame is None:
+            frame = records[-1][0]
+
+        phases = {}
+        for frame_, cat, name, start, duration in records:
+            if frame_ == frame:
+                phases[name] = phases.get(name, 0) + duration
+
+        return phases
+
+    def get_last_frame_phases(self):
+        """Returns a list of (phase name, duration) of the last completely
+        recorded frame, cheaper than get_phase_times since only the end of
+        ring buffer is walked."""
+
+        phases = []
+        frame = None
+
+        for i in range(1, self.__count + 1):
+            j = (self.__index - i) % self.__capacity
+            cat = self.__cats[j]
+
+            if frame is None:
+                # skip records of a frame still in progress
+                if cat == CAT_FRAME:
+                    frame = self.__frames[j]
+                continue
+
+            if self.__frames[j] != frame:
+                break
+
+            if cat == CAT_PHASE:
+                phases.append((self.__names[j], self.__durations[j]))
+
+        phases.reverse()
+        return phases
+
+    def to_chrome_trace(self):
+        """Returns records formatted as chrome trace_event format dict."""
+
+        events = []
+        pid = os.getpid()
+
+        for frame, cat, name, start, duration in self.get_records():
+            events.append({"name": name,
+                           "cat": cat,
+                           "ph": "X",
+                           "ts": start * 1e6,
+                           "dur": duration * 1e6,
+                           "pid": pid,
+                           "tid": 1,
+                           "args": {"frame": frame}})
+
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def dump(self, path=None):
+        """Saves records as a chrome trace json file."""
+
+        import json
+
+        path = path if path else self.trace_path
+
+        with open(path, "w") as file:
+            json.dump(self.to_chrome_trace(), file)
+
+        print("-- Frame trace saved to {0}".format(os.path.abspath(path)))
+        return path
+
+    @property
+    def enabled(self):
+        return self.__enabled
+
+    @property
+    def capacity(self):
+        return self.__capacity
@@ -1,6 +1,5 @@
 import os.path
 from pathlib import Path
-from directoryWatcher import DirWatcher
 from panda3d.core import get_model_path, Filename
 
 
@@ -12,7 +11,9 @@ class Project(object):
         self.__demon = demon
         self.__game = demon.game
         
-        self.__dir_watcher = DirWatcher(any_evt_callback=demon.on_dir_event)
+        # directory watcher is not needed to render first frame, it is
+        # created later by start_dir_watcher
+        self.__dir_watcher = None
         
     def set_project(self, path: str):
         assert os.path.exists(path), "Path does not exists."
@@ -30,10 +31,22 @@ class Project(object):
         # panda_path = Filename.fromOsSpecific(path)
         get_model_path().prependDirectory(path)
         
-        self.__dir_watcher.schedule(path)
+        if self.__dir_watcher:
+            self.__dir_watcher.schedule(path)
         
         print("-- Project created successfully")
         
+    def start_dir_watcher(self):
+        """Starts watching project directory for changes."""
+        if self.__dir_watcher:
+            return
+
+        from directoryWatcher import DirWatcher
+        self.__dir_watcher = DirWatcher(any_evt_callback=self.__demon.on_dir_event)
+
+        if self.__path:
+            self.__dir_watcher.schedule(self.__path)
+
     def reload(self):
         pass
         
@@ -0,0 +1,283 @@
+import os
+import csv
+import json
+import time
+import functools
+import threading
+from collections import deque
+import panda3d.core as p3d
+from hitchDetector import PHASES
+
+
+# collector names, PStats nests collectors by colon separated names
+ENGINE_COLLECTOR = "App:Engine"
+EDITOR_PICKING = "App:Editor:Picking"
+EDITOR_SELECTION = "App:Editor:Selection"
+EDITOR_GIZMOS = "App:Editor:Gizmos"
+LOADER_MODELS = "App:Loader:Models"
+LOADER_TEXTURES = "App:Loader:Textures"
+LOADER_SCRIPTS = "App:Loader:Scripts"
+SCRIPTS_COLLECTOR = "App:Scripts"
+
+
+class StatCollector(object):
+    """A PStats collector which also adds its times to the recorder's capture,
+    can be used as a context manager.
+    Start and stop are no-ops unless recorder is enabled, i.e. capturing or
+    connected to a PStats server.
+
+    Starts are kept per thread, so a collector can be used from task chain
+    threads, and nested, e.g. by a recursive function, only the outermost
+    start to stop is added to the capture, like PStats counts it."""
+
+    def __init__(self, recorder, name):
+        object.__init__(self)
+
+        self.__recorder = recorder
+        self.__name = name
+        self.__pstat = p3d.PStatCollector(name)
+        self.__local = threading.local()  # starts, stack of start times
+
+    def start(self):
+        if self.__recorder.enabled:
+            starts = getattr(self.__local, "starts", None)
+            if starts is None:
+                starts = self.__local.starts = []
+
+            self.__pstat.start(p3d.Thread.getCurrentThread())
+            starts.append(time.perf_counter())
+
+    def stop(self):
+        # started before recorder was enabled
+        starts = getattr(self.__local, "starts", None)
+        if not starts:
+            return
+
+        self.__pstat.stop(p3d.Thread.getCurrentThread())
+        start = starts.pop()
+        if not starts:
+            self.__recorder.add_time(self.__name, time.perf_counter() - start)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+    @property
+    def name(self):
+        return self.__name
+
+
+class PStatsRecorder(object):
+    """PStats collectors for phases of Engine.update, editor (picking,
+    selection, gizmos), resource loading and scripts.
+
+    Times can be sent to a PStats server with connect, and/or captured in
+    process with start_capture, without a server. A capture saves per
+    collector summaries (mean, p50, p95, max, total) with sorted keys, so
+    captures of two runs can be diffed, or compared with compare, per frame
+    times of each collector are saved along as csv.
+
+    When neither capturing nor connected, each collector costs a single
+    attribute check."""
+
+    def __init__(self, capture_path="pstats_capture.json", max_frames=36000):
+        object.__init__(self)
+
+        self.capture_path = capture_path
+        self.__enabled = False
+        self.__capturing = False
+        self.__connected = False
+
+        self.__collectors = {}  # name: StatCollector
+
+        # engine phase collectors, each phase is started when previous ends
+        self.__engine = self.get_collector(ENGINE_COLLECTOR)
+        self.__phases = {phase: self.get_collector("{0}:{1}".format(ENGINE_COLLECTOR, phase))
+                         for phase in PHASES}
+        self.__next_phase = dict(zip(PHASES, PHASES[1:]))
+        self.__phase = None
+
+        # captured frames, (frame number, {name: seconds})
+        self.__frames = deque(maxlen=max_frames)
+        self.__frame = 0
+        self.__frame_times = {}
+        self.__lock = threading.Lock()  # collectors add times from any thread
+
+    def get_collector(self, name):
+        """Returns collector for name, created on first use."""
+        collector = self.__collectors.get(name)
+        if collector is None:
+            collector = StatCollector(self, name)
+            self.__collectors[name] = collector
+        return collector
+
+    def timed(self, name):
+        """Decorator, times each call of decorated function with collector
+        of given name."""
+        collector = self.get_collector(name)
+
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.__enabled:
+                    return func(*args, **kwargs)
+
+                with collector:
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def connect(self, host="localhost", port=-1):
+        """Connects to a PStats server, port -1 uses pstats-port config
+        variable, returns False if no server is listening."""
+        self.__connected = p3d.PStatClient.connect(host, port)
+
+        if self.__connected:
+            print("-- Connected to PStats server")
+        else:
+            print("-- Unable to connect to PStats server at {0}".format(host))
+
+        self.__update_enabled()
+        return self.__connected
+
+    def disconnect(self):
+        if self.__connected:
+            p3d.PStatClient.disconnect()
+            self.__connected = False
+            self.__update_enabled()
+
+    def start_capture(self, path=None):
+        if path:
+            self.capture_path = path
+
+        self.__frames.clear()
+        self.__frame_times = {}
+        self.__capturing = True
+        self.__update_enabled()
+
+    def stop_capture(self, save=True):
+        if not self.__capturing:
+            return
+
+        self.__capturing = False
+        self.__update_enabled()
+
+        if save:
+            self.save()
+
+    def __update_enabled(self):
+        self.__enabled = self.__capturing or self.__connected
+
+    def add_time(self, name, seconds):
+        if self.__capturing:
+            with self.__lock:
+                self.__frame_times[name] = self.__frame_times.get(name, 0) + seconds
+
+    def begin_frame(self, frame):
+        self.__frame = frame
+        self.__engine.start()
+        self.__phase = PHASES[0]
+        self.__phases[self.__phase].start()
+
+    def mark(self, phase):
+        """Ends given phase and starts the one after it."""
+        self.__phases[phase].stop()
+
+        self.__phase = self.__next_phase.get(phase)
+        if self.__phase is not None:
+            self.__phases[self.__phase].start()
+
+    def end_frame(self):
+        if self.__phase is not None:
+            self.__phases[self.__phase].stop()
+            self.__phase = None
+
+        self.__engine.stop()
+
+        if self.__capturing:
+            with self.__lock:
+                self.__frames.append((self.__frame, self.__frame_times))
+                self.__frame_times = {}
+
+    def get_summary(self):
+        """Returns {name: {stat: milliseconds}} of captured frames, frames
+        a collector did not run in are not counted in its stats."""
+        times = {}
+        for frame, frame_times in self.__frames:
+            for name, seconds in frame_times.items():
+                times.setdefault(name, []).append(seconds * 1000)
+
+        summary = {}
+        for name, values in times.items():
+            values.sort()
+            count = len(values)
+            summary[name] = {"frames": count,
+                             "mean": round(sum(values) / count, 4),
+                             "p50": round(values[int(0.5 * (count - 1))], 4),
+                             "p95": round(values[int(0.95 * (count - 1))], 4),
+                             "max": round(values[-1], 4),
+                             "total": round(sum(values), 4)}
+        return summary
+
+    def save(self, path=None):
+        """Saves summary to path as json, per frame times of each collector
+        are saved next to it as csv."""
+        path = path or self.capture_path
+        names = sorted({name for frame, frame_times in self.__frames for name in frame_times})
+
+        with open(path, "w") as file:
+            json.dump({"frames": len(self.__frames), "summary": self.get_summary()},
+                      file, indent=1, sort_keys=True)
+
+        with open(os.path.splitext(path)[0] + ".csv", "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["frame"] + names)
+            for frame, frame_times in self.__frames:
+                writer.writerow([frame] + ["{0:.4f}".format(frame_times.get(name, 0) * 1000)
+                                           for name in names])
+
+        print("-- PStats capture of {0} frames saved to {1}".format(len(self.__frames), path))
+        return path
+
+    @staticmethod
+    def compare(path_a, path_b, stat="mean", min_delta=0.01):
+        """Prints difference in given stat of each collector between two
+        captures, returns {name: (a, b)} in milliseconds."""
+        with open(path_a) as file:
+            summary_a = json.load(file)["summary"]
+        with open(path_b) as file:
+            summary_b = json.load(file)["summary"]
+
+        result = {}
+        print("-- {0} ms, {1} -> {2}".format(stat, path_a, path_b))
+
+        for name in sorted(set(summary_a) | set(summary_b)):
+            a = summary_a.get(name, {}).get(stat, 0)
+            b = summary_b.get(name, {}).get(stat, 0)
+            result[name] = (a, b)
+
+            if abs(b - a) >= min_delta:
+                print("   {0:>9.3f} {1:>9.3f} {2:>+9.3f}  {3}".format(a, b, b - a, name))
+
+        return result
+
+    @property
+    def capturing(self):
+        return self.__capturing
+
+    @property
+    def connected(self):
+        return self.__connected
+
+    @property
+    def enabled(self):
+        return self.__enabled
+
+
+# process wide instance, editor subsystems get their collectors from here
+pstats_recorder = PStatsRecorder()
@@ -0,0 +1,120 @@
+import time
+import panda3d.core as p3d
+
+
+class RegionScheduler(object):
+    """Gives display regions and offscreen buffers their own refresh rates.
+
+    Each scheduled target, a DisplayRegion or a GraphicsOutput, has a target
+    rate and a lower rate used while it does not have focus, on frames it is
+    not due it is made inactive so cull and draw skip it entirely.
+
+    A region drawn directly into the window is cleared along with the rest of
+    the window every frame, so skipping it leaves a hole, targets that should
+    keep their last image between updates must render into a texture buffer,
+    like the game preview does."""
+
+    def __init__(self):
+        object.__init__(self)
+
+        # target: [fps, unfocused_fps, focus_check, next update time,
+        #          was focused, forced]
+        self.__entries = {}
+
+    def add(self, target, fps=None, unfocused_fps=None, focus_check=None):
+        """Schedules target at fps, unfocused_fps is used instead while
+        focus_check returns False, None or 0 for fps means every frame."""
+
+        self.__entries[target] = [fps, unfocused_fps, focus_check, 0, True, True]
+
+    def remove(self, target):
+        if target in self.__entries:
+            del self.__entries[target]
+            target.set_active(True)
+
+    def __contains__(self, target):
+        return target in self.__entries
+
+    def set_rate(self, target, fps=None, unfocused_fps=None):
+        entry = self.__entries[target]
+        entry[0] = fps
+        entry[1] = unfocused_fps
+        entry[5] = True
+
+    def mark_dirty(self, target):
+        """Forces target to be updated next frame, regardless of its rate."""
+        if target in self.__entries:
+            self.__entries[target][5] = True
+
+    def is_focused(self, target):
+        check = self.__entries[target][2]
+        return check is None or check()
+
+    def get_rate(self, target):
+        """Returns rate target is currently updated at, None or 0 if it is
+        updated every frame."""
+        entry = self.__entries[target]
+        if entry[1] and not self.is_focused(target):
+            return entry[1]
+        return entry[0]
+
+    def update(self, only_changed=False, now=None):
+        """Activates targets due this frame and deactivates the rest, if
+        only_changed is True, due targets whose scenes have not changed since
+        their last update are skipped as well.
+        Returns True if any scheduled target will be rendered this frame."""
+
+        if not self.__entries:
+            return False
+
+        now = time.perf_counter() if now is None else now
+        any_active = False
+
+        for target, entry in self.__entries.items():
+            focused = self.is_focused(target)
+
+            # regaining focus should not wait for the slow rate's next tick
+            if focused and not entry[4]:
+                entry[5] = True
+            entry[4] = focused
+
+            fps = entry[0] if focused or not entry[1] else entry[1]
+
+            if entry[5]:
+                active = True
+            elif fps and now < entry[3]:
+                active = False
+            elif only_changed:
+                active = self.is_changed(target)
+            else:
+                active = True
+
+            if active:
+                entry[5] = False
+                if fps:
+                    period = 1.0 / fps
+                    # don't try to catch up after falling behind
+                    entry[3] = entry[3] + period if now - entry[3] < period else now + period
+                any_active = True
+
+            if active != target.is_active():
+                target.set_active(active)
+
+        return any_active
+
+    @staticmethod
+    def is_changed(target):
+        """Returns True if scene rendered by any camera of target has changed,
+        see Engine.needs_redraw."""
+
+        if isinstance(target, p3d.GraphicsOutput):
+            regions = target.get_display_regions()
+        else:
+            regions = (target,)
+
+        for dr in regions:
+            cam = dr.get_camera()
+            if not cam.is_empty() and cam.get_top().node().is_bounds_stale():
+                return True
+
+        return False
@@ -1,9 +1,9 @@
 import os
 import panda3d.core as p3d
 from utils.moduleImporter import import_modules
-from loader.gltf_loader import load_model as gltf_loader
 from game.resources import RuntimeScript, Component
 from system import Systems
+from pstatsRecorder import pstats_recorder, LOADER_MODELS, LOADER_TEXTURES, LOADER_SCRIPTS
 
 
 class ResourceHandler(object):
@@ -14,6 +14,7 @@ class ResourceHandler(object):
         object.__init__(self)
         self.__loader = p3d.Loader.getGlobalPtr()
         
+    @pstats_recorder.timed(LOADER_SCRIPTS)
     def load_scripts(self, paths):
         components = []
         scripts_data = import_modules(paths)
@@ -57,6 +58,7 @@ class ResourceHandler(object):
         
         return runtimescripts, comps
     
+    @pstats_recorder.timed(LOADER_MODELS)
     def load_model(self, path, loader_options=None, use_cached=False,
                    instanced=False, create_np=True, *args, **kwargs):
         """
@@ -85,6 +87,8 @@ class ResourceHandler(object):
         if os.path.isfile(path):
             ext = os.path.splitext(path)[-1]
             if ext == ".gltf" or ext == ".glb":
+                # gltf loader is large, import it only when needed
+                from loader.gltf_loader import load_model as gltf_loader
                 node = gltf_loader(path, *args, **kwargs)
                 node = p3d.NodePath(node)
 
@@ -107,6 +111,7 @@ class ResourceHandler(object):
         result = None if not node else node
         return result
 
+    @pstats_recorder.timed(LOADER_TEXTURES)
     def load_texture(self,
                      path,
                      cube_map=False,
@@ -22,6 +22,7 @@ class SceneCamera(NodePath):
         self.__mouse_watcher_node = None
         self.__aspect2d = None
         self.__mouse = None
+        self.__mark_dirty = None
 
         # create a new camera
         self.__cam = NodePath(Camera("SceneCamera"))
@@ -71,6 +72,7 @@ class SceneCamera(NodePath):
         self.__mouse_watcher_node = engine.mw.node()
         self.__aspect2d = engine.aspect2d
         self.__mouse = engine.mouse
+        self.__mark_dirty = engine.mark_dirty
 
         self.__axes = NodePath(self.axes())
         self.__axes.set_name("CameraAxes")
@@ -153,6 +155,10 @@ class SceneCamera(NodePath):
                 self.__mouse_watcher_node.is_button_down(KeyboardButton.alt()):
             return
 
+        # nothing to redraw while mouse is not moved
+        if not (self.__mouse.dx or self.__mouse.dy):
+            return
+
         # orbit - If left input down
         if self.__mouse.mouse_btns["mouse1"]:
             self.orbit(LVecBase2f(self.__mouse.dx * self.__speed,
@@ -167,8 +173,12 @@ class SceneCamera(NodePath):
         elif self.__mouse.mouse_btns["mouse3"]:
             self.move(LVecBase3f(0, -self.__mouse.dx * self.__speed, 0))
 
+        else:
+            return
+
         # self.setPos(self, self.__target_pos)
         self.update_axes()
+        self.__mark_dirty()
 
     def update_axes(self):
         # update axes
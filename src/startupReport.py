@@ -0,0 +1,154 @@
+import sys
+import time
+from contextlib import contextmanager
+from importlib.abc import MetaPathFinder
+
+
+class _ImportTimer(MetaPathFinder):
+    """Meta path finder which wraps loaders of newly imported modules to time
+    their execution, times are inclusive of nested imports."""
+
+    def __init__(self, report):
+        self.__report = report
+        self.__finding = set()
+        self.__depth = 0
+
+    def find_spec(self, fullname, path, target=None):
+        if fullname in self.__finding:
+            return None
+
+        # let the rest of meta path find the module, then wrap its loader
+        self.__finding.add(fullname)
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self.__finding.discard(fullname)
+
+        # builtin and frozen importers are classes shared by all their
+        # modules, those are cheap and not timed.
+        loader = spec.loader
+        if loader is None or isinstance(loader, type) or \
+                not hasattr(loader, "exec_module"):
+            return spec
+
+        exec_module = loader.exec_module
+
+        def _timed_exec_module(module):
+            start = time.perf_counter()
+            self.__depth += 1
+            try:
+                exec_module(module)
+            finally:
+                self.__depth -= 1
+                self.__report.add_import(fullname, start,
+                                         time.perf_counter() - start, self.__depth)
+
+        loader.exec_module = _timed_exec_module
+        return spec
+
+
+class StartupReport(object):
+    """Collects timings of imports and initialization phases from process
+    start to first rendered frame."""
+
+    def __init__(self):
+        object.__init__(self)
+
+        self.__enabled = False
+        self.__start = time.perf_counter()
+        self.__import_timer = None
+
+        self.__imports = []  # (module name, start, seconds, depth)
+        self.__phases = []   # (phase name, start, seconds, depth)
+        self.__depth = 0
+        self.__first_frame = None
+
+    def enable(self):
+        """Starts recording imports, should be called as early as possible."""
+        if self.__enabled:
+            return
+
+        self.__enabled = True
+        self.__import_timer = _ImportTimer(self)
+        sys.meta_path.insert(0, self.__import_timer)
+
+    def set_start_time(self, start):
+        """Sets time, of time.perf_counter, time to first frame is measured
+        from, by default time this module was imported."""
+        self.__start = start
+
+    def disable(self):
+        if self.__import_timer in sys.meta_path:
+            sys.meta_path.remove(self.__import_timer)
+        self.__enabled = False
+
+    def add_import(self, name, start, seconds, depth):
+        self.__imports.append((name, start, seconds, depth))
+
+    @contextmanager
+    def phase(self, name):
+        """Context manager that times an initialization phase."""
+        start = time.perf_counter()
+        self.__depth += 1
+        try:
+            yield
+        finally:
+            self.__depth -= 1
+            self.__phases.append((name, start, time.perf_counter() - start,
+                                  self.__depth))
+
+    def on_first_frame(self):
+        """Should be called once first frame has been rendered, prints the
+        report if enabled."""
+        if self.__first_frame is not None:
+            return
+
+        self.__first_frame = time.perf_counter() - self.__start
+
+        if self.__enabled:
+            self.disable()
+            self.print_report()
+
+    def print_report(self, min_time=0.001, max_depth=4):
+        """Prints import tree, imports that took less than min_time seconds
+        or are nested deeper than max_depth are left out."""
+
+        print()
+        print("-- Startup report")
+        print("   Time to first frame {0:.1f} ms".format((self.__first_frame or 0) * 1000))
+
+        print()
+        print("   Imports (inclusive of nested imports)")
+        for name, start, seconds, depth in sorted(self.__imports, key=lambda item: item[1]):
+            if seconds >= min_time and depth <= max_depth:
+                print("   {0:>9.1f} ms  {1}{2}".format(seconds * 1000, "  " * depth, name))
+
+        print()
+        print("   Init phases")
+        for name, start, seconds, depth in sorted(self.__phases, key=lambda item: item[1]):
+            print("   {0:>9.1f} ms  {1}{2}".format(seconds * 1000, "  " * depth, name))
+        print()
+
+    @property
+    def enabled(self):
+        return self.__enabled
+
+    @property
+    def imports(self):
+        return list(self.__imports)
+
+    @property
+    def phases(self):
+        return list(self.__phases)
+
+
+# process wide instance, phases of editor startup are recorded here
+startup_report = StartupReport()
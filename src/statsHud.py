@@ -0,0 +1,212 @@
+import time
+from array import array
+from panda3d.core import NodePath, TextNode, GeomNode, Geom, GeomTriangles, GeomTristrips
+from panda3d.core import GeomVertexData, GeomVertexFormat, GeomVertexArrayFormat
+from panda3d.core import GeomVertexWriter, InternalName, AsyncTaskManager
+
+
+# rows of graph vertices start after the two quads of background and budget line
+GRAPH_FIRST_ROW = 8
+
+
+class StatsHud(NodePath):
+    """Overlay on aspect2d showing frame time percentiles, a frame time graph,
+    task, node and geom counts and frame phase timings.
+
+    Samples are the time frames spent working, frame pacer's work time, not
+    the paced frame interval, which would hide anything below the frame
+    budget. Background, budget line and graph are a single Geom allocated
+    once, graph heights are rewritten in place each frame, the text is
+    only regenerated a few times a second so the overlay barely shows up
+    in the numbers it displays."""
+
+    def __init__(self, engine, frame_pacer, num_samples=240, graph_size=(0.8, 0.25),
+                 max_frame_time=1 / 20, text_interval=0.25, count_interval=1.0):
+        NodePath.__init__(self, "StatsHud")
+
+        self.__engine = engine
+        self.__frame_pacer = frame_pacer
+        self.__task_mgr = AsyncTaskManager.getGlobalPtr()
+
+        self.__num_samples = num_samples
+        self.__graph_size = graph_size
+        self.__max_frame_time = max_frame_time  # frame time at top of graph
+        self.__text_interval = text_interval
+        self.__count_interval = count_interval
+
+        # rolling frame times, ring buffer
+        self.__samples = array('d', [0]) * num_samples
+        self.__index = 0
+        self.__count = 0
+
+        # graph heights, in order oldest to newest
+        self.__heights = array('f', [0]) * num_samples
+
+        self.__last_text_update = 0
+        self.__last_count_update = 0
+        self.__num_nodes = 0
+        self.__num_geoms = 0
+
+        self.__graph_vdata = None
+        self.__text = None
+
+        self.create_graph()
+        self.create_text()
+
+        self.reparent_to(engine.aspect2d)
+        self.set_bin("fixed", 100)
+        self.set_depth_test(False)
+        self.set_depth_write(False)
+        self.hide()
+
+    def create_graph(self):
+        width, height = self.__graph_size
+        num = self.__num_samples
+
+        # background, frame budget line and frame time graph are all in one
+        # Geom, vertices are in a float array of their own so graph heights
+        # can be written straight into it, colors in a second array.
+        array_format = GeomVertexArrayFormat()
+        array_format.addColumn(InternalName.getVertex(), 3, Geom.NTFloat32, Geom.CPoint)
+        color_format = GeomVertexArrayFormat()
+        color_format.addColumn(InternalName.getColor(), 4, Geom.NTUint8, Geom.CColor)
+
+        vformat = GeomVertexFormat()
+        vformat.addArray(array_format)
+        vformat.addArray(color_format)
+        vformat = GeomVertexFormat.registerFormat(vformat)
+
+        vdata = GeomVertexData("StatsHudGraph", vformat, Geom.UHDynamic)
+        vdata.uncleanSetNumRows(GRAPH_FIRST_ROW + num * 2)
+        vertex = GeomVertexWriter(vdata, "vertex")
+        color = GeomVertexWriter(vdata, "color")
+
+        # frame budget line, at target frame rate of 60
+        budget = height * (1 / 60) / self.__max_frame_time
+        quads = ((0, 0, width, height, (0, 0, 0, 0.5)),
+                 (0, budget - 0.002, width, budget + 0.002, (1, 1, 0, 1)))
+
+        quad_prim = GeomTriangles(Geom.UHStatic)
+        for i, (left, bottom, right, top, rgba) in enumerate(quads):
+            for x, z in ((left, bottom), (right, bottom), (right, top), (left, top)):
+                vertex.setData3(x, 0, z)
+                color.setData4(*rgba)
+            quad_prim.addVertices(i * 4, i * 4 + 1, i * 4 + 2)
+            quad_prim.addVertices(i * 4, i * 4 + 2, i * 4 + 3)
+
+        # graph is filled, a bottom and a top vertex per sample, x positions
+        # are fixed, only heights of top vertices change
+        for i in range(num):
+            x = width * i / (num - 1)
+            vertex.setData3(x, 0, 0)
+            vertex.setData3(x, 0, 0)
+            color.setData4(0, 1, 0, 1)
+            color.setData4(0, 1, 0, 1)
+
+        graph_prim = GeomTristrips(Geom.UHStatic)
+        graph_prim.addConsecutiveVertices(GRAPH_FIRST_ROW, num * 2)
+        graph_prim.closePrimitive()
+
+        geom = Geom(vdata)
+        geom.addPrimitive(quad_prim)
+        geom.addPrimitive(graph_prim)
+        node = GeomNode("StatsHudGraph")
+        node.addGeom(geom)
+
+        graph_np = self.attachNewNode(node)
+        graph_np.setTransparency(True)
+
+        self.__graph_vdata = graph_np.node().modifyGeom(0).modifyVertexData()
+
+    def create_text(self):
+        text = TextNode("StatsHudText")
+        text.setTextColor(1, 1, 1, 1)
+        text.setShadow(0.05, 0.05)
+        text.setShadowColor(0, 0, 0, 1)
+
+        self.__text = self.attachNewNode(text)
+        self.__text.setScale(0.04)
+        self.__text.setPos(0, 0, self.__graph_size[1] + 0.04)
+
+    def toggle(self):
+        if self.isHidden():
+            self.show()
+        else:
+            self.hide()
+
+    def update(self):
+        # frame time samples are recorded even when hidden, so percentiles
+        # are valid as soon as the hud is shown, work time is of last frame,
+        # this one is still running.
+        self.__samples[self.__index] = self.__frame_pacer.work_time
+        self.__index = (self.__index + 1) % self.__num_samples
+        if self.__count < self.__num_samples:
+            self.__count += 1
+
+        if self.isHidden():
+            return
+
+        # keep hud at top left corner of aspect2d
+        self.setPos(-self.__engine.aspect_ratio + 0.05, 0, 0.35)
+
+        self.update_graph()
+
+        now = time.perf_counter()
+        if now - self.__last_count_update >= self.__count_interval:
+            self.__last_count_update = now
+            self.update_counts()
+
+        if now - self.__last_text_update >= self.__text_interval:
+            self.__last_text_update = now
+            self.update_text()
+
+    def update_graph(self):
+        num = self.__num_samples
+        scale = self.__graph_size[1] / self.__max_frame_time
+        samples = self.__samples
+        heights = self.__heights
+        start = self.__index
+
+        for i in range(num):
+            height = samples[(start + i) % num] * scale
+            heights[i] = height if height < self.__graph_size[1] else self.__graph_size[1]
+
+        # write heights directly into z components of top vertices
+        handle = self.__graph_vdata.modifyArray(0)
+        memoryview(handle).cast('B').cast('f')[GRAPH_FIRST_ROW * 3 + 5::6] = heights
+
+    def update_counts(self):
+        render = self.__engine.render
+        self.__num_nodes = render.node().countNumDescendants()
+
+        num_geoms = 0
+        for np in render.findAllMatches("**/+GeomNode"):
+            num_geoms += np.node().getNumGeoms()
+        self.__num_geoms = num_geoms
+
+    def get_percentiles(self, *percents):
+        """Returns frame times, in seconds, at given percentiles of rolling
+        frame time window."""
+        if not self.__count:
+            return [0 for _ in percents]
+
+        samples = sorted(self.__samples[:self.__count])
+        last = len(samples) - 1
+        return [samples[min(last, int(round(pct / 100 * last)))] for pct in percents]
+
+    def update_text(self):
+        p50, p95, p99 = self.get_percentiles(50, 95, 99)
+
+        lines = ["Frame  p50 {0:.2f}  p95 {1:.2f}  p99 {2:.2f} ms".format(
+                 p50 * 1000, p95 * 1000, p99 * 1000),
+                 "Tasks {0}  Nodes {1}  Geoms {2}".format(
+                 self.__task_mgr.getNumTasks(), self.__num_nodes, self.__num_geoms)]
+
+        profiler = self.__engine.profiler
+        if profiler.enabled:
+            for name, duration in profiler.get_last_frame_phases():
+                lines.append("{0:<20}{1:>7.2f} ms".format(name, duration * 1000))
+        else:
+            lines.append("Phase timings: profiler off (shift-F9)")
+
+        self.__text.node().setText("\n".join(lines))
@@ -3,3 +3,5 @@ import utils.geometry as geometry
 from .singleTask import SingleTask
 from .mouse import Mouse
 from .marquee import Marquee
+from .taskChains import get_task_chain, run_on_main
+from .mainThreadDispatcher import MainThreadDispatcher, main_dispatcher
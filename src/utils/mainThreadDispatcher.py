@@ -0,0 +1,87 @@
+import time
+import threading
+import traceback
+from collections import deque
+
+
+class MainThreadDispatcher(object):
+    """Queue of calls any thread can post to, run on main thread by
+    Engine.update, right after the task manager poll, so watcher, loader
+    and socket threads can hand results over to the scene graph and editor.
+
+    post is lock free, deque appends and pops are atomic, only
+    post_coalesced takes a lock. update runs calls in order of posting
+    until budget seconds are spent, at least one per update, calls posted
+    while it runs are left for next update."""
+
+    def __init__(self, budget=0.002):
+        object.__init__(self)
+
+        self.budget = budget  # seconds per frame
+        self.__calls = deque()  # (func, args, kwargs)
+        self.__coalesced = {}   # key: [func, args, kwargs] of a queued call
+        self.__lock = threading.Lock()
+
+    def post(self, func, *args, **kwargs):
+        """Queues func(*args, **kwargs) to be called on main thread, safe to
+        call from any thread, including main thread."""
+        self.__calls.append((func, args, kwargs))
+
+    def post_coalesced(self, key, func, *args, **kwargs):
+        """Like post, but while a call of same key is still queued, it is
+        replaced by this one instead, e.g. many file changes cause a single
+        reload. Returns False if call was coalesced."""
+        with self.__lock:
+            call = self.__coalesced.get(key)
+            if call is not None:
+                call[:] = (func, args, kwargs)
+                return False
+
+            self.__coalesced[key] = [func, args, kwargs]
+
+        self.__calls.append((self.__run_coalesced, (key,), {}))
+        return True
+
+    def __run_coalesced(self, key):
+        with self.__lock:
+            func, args, kwargs = self.__coalesced.pop(key)
+        func(*args, **kwargs)
+
+    def update(self, budget=None):
+        """Should be called once each frame by main thread, returns number
+        of calls run."""
+        calls = self.__calls
+        if not calls:
+            return 0
+
+        budget = self.budget if budget is None else budget
+        end = time.perf_counter() + budget
+        num_calls = 0
+
+        # calls posted from here on run next update
+        for _ in range(len(calls)):
+            func, args, kwargs = calls.popleft()
+            try:
+                func(*args, **kwargs)
+            except Exception as exception:
+                print("-- Main thread call {0} failed: {1}".format(func, exception))
+                traceback.print_exc()
+
+            num_calls += 1
+            if time.perf_counter() >= end:
+                break
+
+        return num_calls
+
+    def clear(self):
+        self.__calls.clear()
+        with self.__lock:
+            self.__coalesced.clear()
+
+    @property
+    def num_queued(self):
+        return len(self.__calls)
+
+
+# process wide instance, drained by Engine.update
+main_dispatcher = MainThreadDispatcher()
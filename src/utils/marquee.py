@@ -1,5 +1,7 @@
 from panda3d.core import NodePath, CardMaker, LineSegs, Point2
+from system import Systems
 from .singleTask import SingleTask
+from pstatsRecorder import EDITOR_SELECTION
 
 TOLERANCE = 1e-3
 
@@ -7,6 +9,8 @@ TOLERANCE = 1e-3
 class Marquee(NodePath, SingleTask):
     
     """Class representing a 2D marquee drawn by the mouse."""
+
+    stat_group = EDITOR_SELECTION
     
     def __init__(self, name, **kwargs):
         SingleTask.__init__(self, name)
@@ -48,7 +52,10 @@ class Marquee(NodePath, SingleTask):
         if self.mwn.hasMouse():
             # Get the other marquee point and scale to fit
             pos = self.mwn.getMouse() - self.init_mouse_pos
-            self.setScale(pos[0] if pos[0] else TOLERANCE, 1, pos[1] if pos[1] else TOLERANCE)
+            scale = (pos[0] if pos[0] else TOLERANCE, 1, pos[1] if pos[1] else TOLERANCE)
+            if self.getScale() != scale:
+                self.setScale(scale)
+                Systems.demon.engine.mark_dirty()
             
     def on_start(self):
         # Move the marquee to the mouse position and show it
@@ -56,10 +63,12 @@ class Marquee(NodePath, SingleTask):
         self.setPos(self.init_mouse_pos[0], 1, self.init_mouse_pos[1])
         self.setScale(TOLERANCE, 1, TOLERANCE)
         self.show()
+        Systems.demon.engine.mark_dirty()
                     
     def on_stop(self):
         # Hide the marquee
         self.hide()
+        Systems.demon.engine.mark_dirty()
     
     def is_nodepath_inside(self, np):
         """Test if the specified node path lies within the marquee area."""
@@ -1,5 +1,9 @@
 from panda3d.core import Point3, Vec3, Mat4
-from direct.directtools.DirectUtil import ROUND_TO
+
+
+def round_to(value, divisor):
+    """Returns value rounded to the nearest multiple of divisor."""
+    return round(value / float(divisor)) * divisor
 
 
 def closest_point_to_line(c, a, b):
@@ -53,6 +57,6 @@ def snap_point(pnt, amt):
     Return a new point based on the indicated point but snapped to the nearest
     indicated amount.
     """
-    return Vec3(ROUND_TO(pnt[0], amt),
-                ROUND_TO(pnt[1], amt),
-                ROUND_TO(pnt[2], amt))
+    return Vec3(round_to(pnt[0], amt),
+                round_to(pnt[1], amt),
+                round_to(pnt[2], amt))
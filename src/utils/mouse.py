@@ -1,4 +1,4 @@
-from panda3d.core import MouseButton
+from panda3d.core import MouseButton, GraphicsWindow, Point2
 
 
 class Mouse(object):
@@ -28,11 +28,25 @@ class Mouse(object):
                              MouseButton.five().name: False, }
 
         # ---------------------------------------------
-        self.__mp = self.__win.getPointer(0)
+        # offscreen buffers have no pointer, in that case mouse position is
+        # read back from the mouse watcher node instead.
+        self.__has_pointer = isinstance(self.__win, GraphicsWindow)
+        self.__mp = self.get_pointer()
+
+    def get_pointer(self):
+        """Returns mouse position in window pixel coordinates."""
+        if self.__has_pointer:
+            return self.__win.getPointer(0)
+
+        mp = self.__mwn.getMouse() if self.__mwn.hasMouse() else (0, 0)
+        x = (mp[0] + 1) * 0.5 * self.__win.getXSize()
+        y = (1 - mp[1]) * 0.5 * self.__win.getYSize()
+        return Point2(x, y)
 
     def update(self):
         # for mouse move input
         if not self.__mwn.hasMouse():
+            self.__dx = self.__dy = 0
             return
 
         # update mouse buttons
@@ -40,7 +54,7 @@ class Mouse(object):
             self.__mouse_btns[btn] = self.__mwn.is_button_down(btn)
 
         # Get pointer from screen, calculate delta
-        self.__mp = self.__win.getPointer(0)  # mouse position
+        self.__mp = self.get_pointer()  # mouse position
 
         self.__dx = self.__x - self.__mp.getX()  # delta x
         self.__dy = self.__y - self.__mp.getY()  # delta y
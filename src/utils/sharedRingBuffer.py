@@ -0,0 +1,141 @@
+import os
+import struct
+from multiprocessing import shared_memory
+
+
+# capacity, write position, read position, positions are total bytes
+# written and read, they only ever increase.
+_HEADER = struct.Struct("<QQQ")
+_LENGTH = struct.Struct("<I")
+_WRAP = 0xFFFFFFFF  # rest of buffer is unused, next message is at its start
+
+
+class SharedRingBuffer(object):
+    """Single producer, single consumer message queue in shared memory.
+
+    Messages are length prefixed byte strings, a message is never split
+    across end of buffer, writes never block, write returns False if there
+    is not enough free space and the message is dropped.
+
+    The process creating a buffer owns it and should unlink it once done,
+    other processes attach to it by name."""
+
+    def __init__(self, size=1 << 20, name=None):
+        object.__init__(self)
+
+        self.__owner = name is None
+
+        if self.__owner:
+            self.__shm = shared_memory.SharedMemory(create=True, size=_HEADER.size + size)
+            _HEADER.pack_into(self.__shm.buf, 0, size, 0, 0)
+        else:
+            self.__shm = self.__attach(name)
+
+        self.__capacity = _HEADER.unpack_from(self.__shm.buf, 0)[0]
+
+    @staticmethod
+    def __attach(name):
+        try:
+            return shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            shm = shared_memory.SharedMemory(name=name)
+
+        # before python 3.13 attaching registers the segment with this
+        # process's resource tracker, which unlinks it when process exits
+        if os.name == "posix":
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, "shared_memory")
+
+        return shm
+
+    def write(self, data):
+        """Appends a message, returns False if buffer is full."""
+        buf = self.__shm.buf
+        capacity = self.__capacity
+        needed = _LENGTH.size + len(data)
+
+        if needed > capacity:
+            raise ValueError("Message of {0} bytes is larger than ring buffer".format(len(data)))
+
+        _, write_pos, read_pos = _HEADER.unpack_from(buf, 0)
+        free = capacity - (write_pos - read_pos)
+        offset = write_pos % capacity
+        tail = capacity - offset
+
+        if tail < needed:
+            # message does not fit before end of buffer, skip to start
+            if free < tail + needed:
+                return False
+
+            if tail >= _LENGTH.size:
+                _LENGTH.pack_into(buf, _HEADER.size + offset, _WRAP)
+
+            write_pos += tail
+            offset = 0
+
+        elif free < needed:
+            return False
+
+        start = _HEADER.size + offset
+        _LENGTH.pack_into(buf, start, len(data))
+        buf[start + _LENGTH.size:start + needed] = data
+
+        # publish message only after it has been written completely
+        struct.pack_into("<Q", buf, 8, write_pos + needed)
+        return True
+
+    def read(self):
+        """Removes and returns oldest message, None if buffer is empty."""
+        buf = self.__shm.buf
+        capacity = self.__capacity
+
+        _, write_pos, read_pos = _HEADER.unpack_from(buf, 0)
+
+        while read_pos != write_pos:
+            offset = read_pos % capacity
+            tail = capacity - offset
+
+            if tail < _LENGTH.size:
+                read_pos += tail
+                continue
+
+            start = _HEADER.size + offset
+            length = _LENGTH.unpack_from(buf, start)[0]
+
+            if length == _WRAP:
+                read_pos += tail
+                continue
+
+            data = bytes(buf[start + _LENGTH.size:start + _LENGTH.size + length])
+            struct.pack_into("<Q", buf, 16, read_pos + _LENGTH.size + length)
+            return data
+
+        struct.pack_into("<Q", buf, 16, read_pos)
+        return None
+
+    def read_all(self):
+        """Removes and returns all messages currently in buffer."""
+        messages = []
+        data = self.read()
+        while data is not None:
+            messages.append(data)
+            data = self.read()
+        return messages
+
+    def close(self):
+        """Detaches from buffer, owner also destroys it."""
+        if self.__shm is None:
+            return
+
+        self.__shm.close()
+        if self.__owner:
+            self.__shm.unlink()
+        self.__shm = None
+
+    @property
+    def name(self):
+        return self.__shm.name
+
+    @property
+    def capacity(self):
+        return self.__capacity
@@ -1,17 +1,37 @@
+import types
+import inspect
 from panda3d.core import AsyncTaskManager, PythonTask
 from system import Systems
+from pstatsRecorder import pstats_recorder, SCRIPTS_COLLECTOR
+from .taskChains import get_task_chain, run_on_main
 
 
 class SingleTask(object):
+    # pstats collector group, updates are timed as "<group>:<name>"
+    stat_group = SCRIPTS_COLLECTOR
+
     def __init__(self, name):
         object.__init__(self)
 
         self.__name = name
         self.__task = None
         self.__sort = 0
+        self.__task_chain = None  # default chain, run by main thread
+        self.__async_tasks = set()  # coroutines started by this object
+        self.__collector = pstats_recorder.get_collector(
+            "{0}:{1}".format(self.stat_group, name))
 
     def start(self, sort=None):
-        self.on_start()
+        # update runs each frame, it can't wait for a coroutine
+        for method in (self.on_update, self.on_fixed_update):
+            if inspect.iscoroutinefunction(method):
+                raise TypeError("{0} of {1} can't be a coroutine, start coroutines "
+                                "with run_async instead".format(method.__name__, self.__name))
+
+        # on_start may be a coroutine, it is then run on the asyncio loop
+        result = self.on_start()
+        if isinstance(result, types.CoroutineType):
+            self.run_async(result)
 
         if sort is None:
             sort = self.__sort
@@ -22,24 +42,56 @@ class SingleTask(object):
             
             self.__task = PythonTask(self.update, task_label)
             self.__task.set_sort(sort)
+            if self.__task_chain:
+                self.__task.set_task_chain(self.__task_chain)
             AsyncTaskManager.getGlobalPtr().add(self.__task)
 
+            # only objects which override on_fixed_update are scheduled
+            # for fixed updates.
+            if type(self).on_fixed_update is not SingleTask.on_fixed_update:
+                Systems.demon.engine.fixed_scheduler.add(self.fixed_update, sort)
+
     def update(self, task):
         """Run on_update method - return task.cont if there was no return value"""
+        self.__collector.start()
         try:
-            self.on_update()
+            result = self.on_update()
+            if isinstance(result, types.CoroutineType):
+                result.close()
+                raise TypeError("on_update of {0} returned a coroutine, start coroutines "
+                                "with run_async instead".format(self.__name))
         except Exception as exception:
             print(exception)
-            Systems.game.stop()
+            run_on_main(Systems.game.stop)
+        finally:
+            self.__collector.stop()
 
         return task.DS_cont
 
+    def fixed_update(self, dt):
+        """Run on_fixed_update method, called by engine's fixed step scheduler."""
+        self.__collector.start()
+        try:
+            self.on_fixed_update(dt)
+        except Exception as exception:
+            print(exception)
+            Systems.game.stop()
+        finally:
+            self.__collector.stop()
+
     def stop(self):
-        """Remove the object's task from the task manager."""
-        
+        """Remove the object's task from the task manager, cancels its
+        coroutines still pending."""
+
+        for task in list(self.__async_tasks):
+            task.cancel()
+        self.__async_tasks.clear()
+
         if self.__task in AsyncTaskManager.getGlobalPtr().getActiveTasks():
             AsyncTaskManager.getGlobalPtr().remove(self.__task)
             self.__task = None
+
+        Systems.demon.engine.fixed_scheduler.remove(self.fixed_update)
                 
         self.on_stop()
 
@@ -54,6 +106,13 @@ class SingleTask(object):
         """Override this function with code to be executed each frame."""
         pass
 
+    def on_fixed_update(self, dt):
+        """
+        Override this function with code to be executed each fixed simulation
+        step, dt is the fixed step size, independent of frame rate.
+        """
+        pass
+
     def on_stop(self):
         """
         Override this function with code to be executed when the object is
@@ -72,9 +131,41 @@ class SingleTask(object):
     
     def set_sort(self, val):
         self.__sort = val
+
+    def set_task_chain(self, name, num_threads=1, frame_sync=True, **kwargs):
+        """
+        Runs update on given task chain, by its own worker threads instead of
+        main thread, see utils.taskChains.get_task_chain for options, they
+        only apply when the chain is first created. Should be called before
+        start, None puts update back on the default chain.
+        on_update then must not touch the scene graph or editor directly, use
+        call_on_main to hand results over to main thread, on_fixed_update is
+        always run on main thread.
+        """
+        if name:
+            get_task_chain(name, num_threads, frame_sync, **kwargs)
+        self.__task_chain = name
+
+    def run_async(self, coro):
+        """Schedules a coroutine on engine's asyncio loop, it is cancelled if
+        still pending when this object is stopped."""
+        task = Systems.demon.async_loop.create_task(coro)
+        self.__async_tasks.add(task)
+        task.add_done_callback(self.__async_tasks.discard)
+        return task
+
+    def call_on_main(self, func, *args):
+        """
+        Calls func on main thread, at the start of next frame if called
+        from a worker thread.
+        """
+        return run_on_main(func, *args)
     
     def sort(self):
         return self.__sort
+
+    def task_chain(self):
+        return self.__task_chain
     
     @property
     def name(self):
@@ -0,0 +1,47 @@
+import threading
+from panda3d.core import AsyncTaskManager, Thread, TP_normal
+from .mainThreadDispatcher import main_dispatcher
+
+
+def get_task_chain(name, num_threads=1, frame_sync=True, thread_priority=TP_normal,
+                   frame_budget=-1):
+    """Returns task chain of given name of the global task manager, created
+    and configured on first use, tasks on it are run by its own num_threads
+    worker threads.
+
+    With frame_sync, the default, worker threads wait for the next frame
+    after each pass over the chain's tasks, so each task runs at most once a
+    frame, otherwise tasks run as often as the threads can run them.
+
+    Threads run python code holding the GIL, so they only run in parallel
+    with main thread while in panda calls, or other code that releases it."""
+
+    task_mgr = AsyncTaskManager.getGlobalPtr()
+    chain = task_mgr.findTaskChain(name)
+
+    if chain is None:
+        chain = task_mgr.makeTaskChain(name)
+        chain.setNumThreads(num_threads if Thread.isThreadingSupported() else 0)
+        chain.setFrameSync(frame_sync)
+        chain.setThreadPriority(thread_priority)
+        chain.setFrameBudget(frame_budget)
+
+    return chain
+
+
+def is_main_thread():
+    return threading.current_thread() is threading.main_thread()
+
+
+def run_on_main(func, *args):
+    """Calls func with args on main thread, posted to main_dispatcher and
+    run at the start of next frame, or right away if already on main
+    thread. Safe to call from any thread, returns True if func was posted,
+    False if it was called."""
+
+    if is_main_thread():
+        func(*args)
+        return False
+
+    main_dispatcher.post(func, *args)
+    return True
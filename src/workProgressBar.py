@@ -0,0 +1,68 @@
+from panda3d.core import NodePath, TextNode, CardMaker
+
+
+class WorkProgressBar(NodePath):
+    """Bar at bottom of aspect2d showing name and progress of the work
+    queue job being run, hidden while queue is empty."""
+
+    def __init__(self, engine, size=(0.8, 0.03)):
+        NodePath.__init__(self, "WorkProgressBar")
+
+        self.__engine = engine
+        self.__size = size
+        self.__job = None
+        self.__progress = None
+
+        width, height = size
+
+        cm = CardMaker("WorkProgressBarBg")
+        cm.setFrame(0, width, 0, height)
+        bg = self.attachNewNode(cm.generate())
+        bg.setColor(0, 0, 0, 0.5)
+        bg.setTransparency(True)
+
+        cm = CardMaker("WorkProgressBarFill")
+        cm.setFrame(0, width, 0, height)
+        self.__fill = self.attachNewNode(cm.generate())
+        self.__fill.setColor(0.2, 0.6, 1, 1)
+
+        text = TextNode("WorkProgressBarText")
+        text.setTextColor(1, 1, 1, 1)
+        self.__text = self.attachNewNode(text)
+        self.__text.setScale(0.035)
+        self.__text.setPos(0, 0, height + 0.015)
+
+        self.reparent_to(engine.aspect2d)
+        self.set_bin("fixed", 100)
+        self.set_depth_test(False)
+        self.set_depth_write(False)
+        self.hide()
+
+    def update(self):
+        job = self.__engine.work_queue.get_current_job()
+
+        if job is None:
+            if not self.isHidden():
+                self.hide()
+                self.__job = None
+                self.__engine.mark_dirty()
+            return
+
+        progress = job.progress
+        if job is self.__job and progress == self.__progress:
+            return
+
+        self.__job = job
+        self.__progress = progress
+
+        self.setPos(-self.__size[0] / 2, 0, -0.9)
+        self.show()
+
+        # unknown progress is shown as an empty bar
+        fraction = min(max(progress or 0, 0), 1)
+        self.__fill.setSx(max(fraction, 0.001))
+
+        if progress is None:
+            self.__text.node().setText(job.name)
+        else:
+            self.__text.node().setText("{0} {1:.0f}%".format(job.name, fraction * 100))
@@ -0,0 +1,186 @@
+import heapq
+import time
+import traceback
+
+
+class Job(object):
+    """A generator based job run by WorkQueue, each step runs the generator
+    to its next yield.
+
+    A job yields its progress, a fraction from 0 to 1, or None if unknown,
+    its return value is kept as result and passed to on_done."""
+
+    def __init__(self, generator, name="Job", priority=0, on_done=None):
+        object.__init__(self)
+
+        self.__generator = generator
+        self.__name = name
+        self.__priority = priority
+        self.__on_done = on_done
+
+        self.__progress = None
+        self.__result = None
+        self.__error = None
+        self.__done = False
+        self.__cancelled = False
+        self.__running = False  # generator is executing a step
+
+    def step(self):
+        """Runs job to its next yield, returns False once job has ended."""
+        if self.__done:
+            return False
+
+        self.__running = True
+        finished = False
+        try:
+            self.__progress = next(self.__generator)
+
+        except StopIteration as stop:
+            self.__result = stop.value
+            self.__progress = 1.0
+            self.__finish()
+            finished = True
+
+        except Exception as exception:
+            self.__fail(exception)
+
+        finally:
+            self.__running = False
+
+        # called out of the except block, so its errors are caught too
+        if finished and self.__on_done:
+            try:
+                self.__on_done(self.__result)
+            except Exception as exception:
+                self.__fail(exception)
+
+        # cancelled by itself, generator could not be closed while running
+        if self.__cancelled and not self.__done:
+            self.__generator.close()
+            self.__finish()
+
+        return not self.__done
+
+    def cancel(self):
+        """Stops job, its generator is closed so its finally blocks run."""
+        if self.__done or self.__cancelled:
+            return
+
+        self.__cancelled = True
+        if not self.__running:
+            self.__generator.close()
+            self.__finish()
+
+    def __fail(self, exception):
+        print("-- Job '{0}' failed: {1}".format(self.__name, exception))
+        traceback.print_exc()
+        self.__error = exception
+        self.__finish()
+
+    def __finish(self):
+        self.__done = True
+        self.__generator = None
+
+    @property
+    def name(self):
+        return self.__name
+
+    @property
+    def priority(self):
+        return self.__priority
+
+    @property
+    def progress(self):
+        return self.__progress
+
+    @property
+    def result(self):
+        return self.__result
+
+    @property
+    def error(self):
+        return self.__error
+
+    @property
+    def done(self):
+        return self.__done
+
+    @property
+    def cancelled(self):
+        return self.__cancelled
+
+
+class WorkQueue(object):
+    """Runs generator based jobs on main thread a bit each frame, for
+    operations too large to finish in one frame, such as touching
+    thousands of nodes.
+
+    update resumes jobs until budget seconds are spent, jobs of higher
+    priority first and jobs of equal priority in order of submission, a
+    job is resumed at least once per update so it always makes progress."""
+
+    def __init__(self, budget=0.004):
+        object.__init__(self)
+
+        self.budget = budget  # seconds per frame
+        self.__heap = []      # (-priority, sequence, job)
+        self.__sequence = 0
+
+    def submit(self, generator, name="Job", priority=0, on_done=None):
+        """Queues a generator, or a Job, returns the job."""
+        job = generator if isinstance(generator, Job) else \
+            Job(generator, name, priority, on_done)
+
+        heapq.heappush(self.__heap, (-job.priority, self.__sequence, job))
+        self.__sequence += 1
+        return job
+
+    def cancel_all(self):
+        for item in self.__heap:
+            item[2].cancel()
+        self.__heap = []
+
+    def update(self, budget=None):
+        """Should be called once each frame, returns True if any job was
+        resumed."""
+        heap = self.__heap
+        if not heap:
+            return False
+
+        budget = self.budget if budget is None else budget
+        end = time.perf_counter() + budget
+        worked = False
+
+        while heap:
+            job = heap[0][2]
+
+            if job.done:
+                heapq.heappop(heap)
+                continue
+
+            job.step()
+            worked = True
+
+            if time.perf_counter() >= end:
+                break
+
+        # drop jobs that ended in last step
+        while heap and heap[0][2].done:
+            heapq.heappop(heap)
+
+        return worked
+
+    def get_current_job(self):
+        """Returns job that will be resumed next, None if queue is empty."""
+        for item in sorted(self.__heap):
+            if not item[2].done:
+                return item[2]
+        return None
+
+    @property
+    def jobs(self):
+        return [item[2] for item in sorted(self.__heap) if not item[2].done]
+
+    @property
+    def is_busy(self):
+        return any(not item[2].done for item in self.__heap)